@@ -0,0 +1,150 @@
+"""Calculate skill training data from asyncio code.
+
+The calculations run in an executor, so the event loop is never blocked:
+
+    planner = AsyncPlanner()
+    plan = await planner.plan(skill_levels, 1, 50, "fast", timeout=5)
+    async for job, plan in planner.plan_many(jobs):
+        ...
+
+Identical requests that are in flight at the same time share one
+calculation. Cancelling a caller or hitting its timeout does not affect
+other callers waiting for the same plan.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import cache as c
+import calculator as calc
+
+
+class AsyncPlanner:
+    """Asyncio facade for the calculator functions.
+
+    Attributes:
+        executor: concurrent.futures executor, defaults to a process pool
+            that is started on first use
+        cache: optional PlanCache for finished plans
+    """
+
+    def __init__(self, executor=None, cache=None):
+        self.__executor = executor
+        self.__owns_executor = executor is None
+        self.__cache = cache
+        self.__in_flight = {}
+
+    def close(self, wait=True):
+        """Shut down the default process pool."""
+        if self.__owns_executor and self.__executor is not None:
+            self.__executor.shutdown(wait=wait)
+            self.__executor = None
+
+    async def plan(self, skill_levels, current_level, goal_level, mode,
+                   legendary=None, timeout=None):
+        """Return training data, raise asyncio.TimeoutError after timeout.
+
+        Attributes:
+            skill_levels: dict containing current levels of used skills
+            current_level (int): current character level
+            goal_level (int): goal level
+            mode (str): name of the training mode, see calculator.MODES
+            legendary: skills that may be made legendary, None allows all
+            timeout (float): seconds to wait, None waits forever
+        """
+        if legendary is not None:
+            legendary = list(legendary)
+        key = c.plan_key(skill_levels, current_level, goal_level, mode,
+                         legendary)
+        if self.__cache is not None:
+            plan = self.__cache.get(key)
+            if plan is not None:
+                return plan
+
+        future = self.__in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor()
+            future = loop.run_in_executor(self.__executor, calc.MODES[mode],
+                                          dict(skill_levels), current_level,
+                                          goal_level, legendary)
+            self.__in_flight[key] = future
+            future.add_done_callback(lambda f: self.__finish(key, f))
+
+        # shielded, so a cancelled caller leaves the calculation running
+        # for the others
+        plan = await asyncio.wait_for(asyncio.shield(future), timeout)
+        return c.copy_plan(plan)
+
+    def plan_many(self, jobs, timeout=None):
+        """Return an async iterator over (job, plan) pairs.
+
+        Jobs are (skill levels, current, goal, mode) tuples, optionally
+        with the legendary skills as fifth item. All of them are started
+        at once and pairs are produced in the order the plans are
+        finished. A failing job raises its exception and cancels the
+        remaining jobs.
+        """
+        return PlanIterator(self, jobs, timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __finish(self, key, future):
+        if self.__in_flight.get(key) is future:
+            del self.__in_flight[key]
+        if (self.__cache is not None and not future.cancelled() and
+                future.exception() is None):
+            self.__cache.put(key, future.result())
+
+
+class PlanIterator:
+    """Async iterator over plans of several jobs, see AsyncPlanner.plan_many.
+
+    Call cancel() to stop the jobs that are not finished yet.
+    """
+
+    def __init__(self, planner, jobs, timeout=None):
+        self.__planner = planner
+        self.__jobs = [tuple(job) for job in jobs]
+        self.__timeout = timeout
+        self.__pending = None
+
+    def cancel(self):
+        for task in self.__pending or ():
+            task.cancel()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.__pending is None:
+            self.__pending = {asyncio.ensure_future(self.__run(job))
+                              for job in self.__jobs}
+        if not self.__pending:
+            raise StopAsyncIteration
+
+        try:
+            done, self.__pending = await asyncio.wait(
+                self.__pending, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        task = done.pop()
+        self.__pending |= done
+        if task.exception() is not None:
+            self.cancel()
+            self.__pending = set()
+        return task.result()
+
+    async def __run(self, job):
+        plan = await self.__planner.plan(*job, timeout=self.__timeout)
+        return job, plan
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
@@ -0,0 +1,287 @@
+"""Calculate training strategies for many characters at once.
+
+Vectorized versions of the calculator functions. Skill levels are passed as
+an (N, 18) matrix whose columns follow GameData.SKILL_NAMES, a level of 0
+marks a skill that is not used. Ties are broken by column order, so results
+match the calculator for skill dicts in GameData.SKILL_NAMES order.
+"""
+
+import numpy as np
+
+import calculator as calc
+from inputparser import GameData
+
+
+def calculate_balanced_batch(skill_levels, current_levels, goal_levels):
+    """Return skill training data for a balanced training method.
+
+    Attributes:
+        skill_levels: (N, 18) matrix, 0 for unused skills
+        current_levels: N current character levels
+        goal_levels: N goal levels
+    """
+    start, used, remaining = _prepare(skill_levels, current_levels,
+                                      goal_levels)
+
+    def round_xp(rounds):
+        gained = _xp_gained(start, rounds[:, None]) * used
+        return gained.sum(axis=1)
+
+    # binary search the number of complete rounds leaving xp to gain
+    low = np.zeros(len(start), dtype=np.int64)
+    high = np.maximum(remaining, 0) // 16 + 1
+    while (low < high).any():
+        middle = (low + high + 1) // 2
+        enough = round_xp(middle) >= remaining
+        searching = low < high
+        low = np.where(searching & ~enough, middle, low)
+        high = np.where(searching & enough, middle - 1, high)
+    remaining = remaining - round_xp(low)
+
+    # the last round is incomplete, it ends with the first column that
+    # reaches the goal
+    gains = _trained_level(start, low[:, None] + 1) * used
+    reached = np.cumsum(gains, axis=1) >= remaining[:, None]
+    last = np.where(reached.any(axis=1), reached.argmax(axis=1), -1)
+    columns = np.arange(start.shape[1])
+    extra = (columns[None, :] <= last[:, None]) & (remaining[:, None] > 0)
+
+    times = (low[:, None] + extra) * used
+    final = np.where(used, _trained_level(start, times), start)
+    return _result(final, times, _times_legendary(start, times))
+
+
+def calculate_easy_batch(skill_levels, current_levels, goal_levels):
+    """Return skill training data for the easiest possible training.
+
+    Attributes:
+        skill_levels: (N, 18) matrix, 0 for unused skills
+        current_levels: N current character levels
+        goal_levels: N goal levels
+    """
+    start, used, remaining = _prepare(skill_levels, current_levels,
+                                      goal_levels)
+    final = start.copy()
+    wraps = np.zeros_like(start)
+
+    active = np.flatnonzero(remaining > 0)
+    while len(active):
+        levels = final[active]
+        in_use = used[active]
+        lowest = np.where(in_use, levels, 101).min(axis=1)
+        tier = in_use & (levels == lowest[:, None])
+        size = tier.sum(axis=1)
+
+        # everything is maxed, the first skill goes legendary, whole cycles
+        # ending at 100 again are skipped
+        top = lowest == 100
+        rows, columns = active[top], tier[top].argmax(axis=1)
+        cycles = (remaining[rows] - 1) // calc.CYCLE_XP
+        wraps[rows, columns] += cycles
+        remaining[rows] -= cycles * calc.CYCLE_XP
+        final[rows, columns] = 16
+        wraps[rows, columns] += 1
+        remaining[rows] -= 16
+
+        # raise whole tiers until they reach the next tier
+        ceiling = np.where(in_use & ~tier, levels, 101).min(axis=1)
+        ceiling = np.minimum(ceiling, 100)
+        gain = _level_sum(lowest, ceiling) * size
+        full = ~top & (gain < remaining[active])
+        rows = active[full]
+        final[rows] = np.where(tier[full], ceiling[full, None], levels[full])
+        remaining[rows] -= gain[full]
+
+        # the goal is reached inside the tier
+        part = ~top & ~full
+        rows, level, size = active[part], lowest[part], size[part]
+        rest = remaining[rows]
+        raised = _whole_steps(level, (rest - 1) // size, 100 - level)
+        rest = rest - _level_sum(level, level + raised) * size
+        level = level + raised
+        steps = -(-rest // (level + 1))
+        order = np.cumsum(tier[part], axis=1)
+        trained = tier[part] & (order <= steps[:, None])
+        final[rows] = np.where(tier[part], level[:, None] + trained,
+                               final[rows])
+        remaining[rows] = 0
+
+        active = np.flatnonzero(remaining > 0)
+
+    times = (final - start + 85 * wraps) * used
+    return _result(final, times, wraps * used)
+
+
+def calculate_fast_batch(skill_levels, current_levels, goal_levels):
+    """Return skill training data for the fastest possible training.
+
+    Attributes:
+        skill_levels: (N, 18) matrix, 0 for unused skills
+        current_levels: N current character levels
+        goal_levels: N goal levels
+    """
+    start, used, remaining = _prepare(skill_levels, current_levels,
+                                      goal_levels)
+    final = start.copy()
+    wraps = np.zeros_like(start)
+
+    active = np.flatnonzero(remaining > 0)
+    while len(active):
+        columns = np.where(used[active], final[active], -1).argmax(axis=1)
+        level = final[active, columns]
+
+        # 'make legendary', whole cycles are skipped if no other skill is
+        # selected after the reset
+        top = level == 100
+        rows = active[top]
+        others = np.arange(start.shape[1])[None, :] != columns[top, None]
+        higher = used[rows] & others & (
+            (final[rows] > 16) |
+            ((final[rows] == 16) &
+             (np.arange(start.shape[1])[None, :] < columns[top, None])))
+        cycles = np.where(higher.any(axis=1), 0,
+                          (remaining[rows] - 1) // calc.CYCLE_XP)
+        wraps[rows, columns[top]] += cycles
+        remaining[rows] -= cycles * calc.CYCLE_XP
+        final[rows, columns[top]] = 16
+        wraps[rows, columns[top]] += 1
+        remaining[rows] -= 16
+
+        # train up to 100 in one go
+        gain = _level_sum(level, 100)
+        full = ~top & (gain < remaining[active])
+        rows = active[full]
+        final[rows, columns[full]] = 100
+        remaining[rows] -= gain[full]
+
+        # the goal is reached on the way
+        part = ~top & ~full
+        rows = active[part]
+        final[rows, columns[part]] += _steps_needed(level[part],
+                                                    remaining[rows])
+        remaining[rows] = 0
+
+        active = np.flatnonzero(remaining > 0)
+
+    times = (final - start + 85 * wraps) * used
+    return _result(final, times, wraps * used)
+
+
+def calculate_batch(mode, skill_levels, current_levels, goal_levels):
+    """Return skill training data of any registered strategy.
+
+    Modes without a vectorized version (see BATCH_FUNCTIONS) are calculated
+    row by row with calculator.MODES.
+    Attributes:
+        mode (str): name of the training mode
+        skill_levels: (N, 18) matrix, 0 for unused skills
+        current_levels: N current character levels
+        goal_levels: N goal levels
+    """
+    if mode in BATCH_FUNCTIONS:
+        return BATCH_FUNCTIONS[mode](skill_levels, current_levels,
+                                     goal_levels)
+
+    start, used, _ = _prepare(skill_levels, current_levels, goal_levels)
+    now = np.broadcast_to(current_levels, len(start))
+    goal = np.broadcast_to(goal_levels, len(start))
+    final, times, legendary = (np.zeros_like(start) for _ in range(3))
+    for row in range(len(start)):
+        columns = np.flatnonzero(used[row])
+        plan = calc.MODES[mode](
+            {GameData.SKILL_NAMES[j]: int(start[row, j]) for j in columns},
+            int(now[row]), int(goal[row]))
+        for j in columns:
+            data = plan[GameData.SKILL_NAMES[j]]
+            final[row, j] = data["Final Level"]
+            times[row, j] = data["Times Leveled"]
+            legendary[row, j] = data["Times Legendary"]
+    final = np.where(used, final, start)
+    return _result(final, times, legendary)
+
+
+def skill_matrix(skill_level_dicts):
+    """Return an (N, 18) skill level matrix built from calculator input dicts.
+
+    Attributes:
+        skill_level_dicts: dicts containing current levels of used skills
+    """
+    return np.array([[levels.get(skill, 0) for skill in GameData.SKILL_NAMES]
+                     for levels in skill_level_dicts], dtype=np.int64)
+
+
+def _level_sum(level, goal):
+    """Return xp gained by training skills from level to goal (<= 100)."""
+    return (goal - level) * (goal + level + 1) // 2
+
+
+def _prepare(skill_levels, current_levels, goal_levels):
+    """Return start levels, used-skill mask and needed xp as arrays."""
+    start = np.array(skill_levels, dtype=np.int64, ndmin=2)
+    used = start > 0
+    if not used.any(axis=1).all():
+        raise ValueError("Every character needs at least one skill.")
+
+    now = np.asarray(current_levels, dtype=np.int64)
+    goal = np.maximum(np.asarray(goal_levels, dtype=np.int64), now)
+    remaining = (goal - now) * (goal + now - 1) // 2 * 25 + (goal - now) * 75
+    return start, used, np.array(remaining, dtype=np.int64, ndmin=1)
+
+
+def _result(final, times, legendary):
+    return {"Final Level": final,
+            "Times Leveled": times,
+            "Times Legendary": legendary}
+
+
+def _steps_needed(level, xp):
+    """Return how often skills have to be trained to gain at least xp.
+
+    No skill may reach 100 on the way.
+    """
+    return _whole_steps(level, xp - 1, 100 - level) + 1
+
+
+def _times_legendary(level, times):
+    """Return how often skills are made legendary by training them."""
+    return np.where(level + times <= 100, 0,
+                    (times - (100 - level) - 1) // 85 + 1)
+
+
+def _trained_level(level, times):
+    """Return levels reached by training skills a number of times."""
+    overflow = np.maximum(times - (100 - level), 0) % 85
+    return np.where(level + times <= 100, level + times,
+                    np.where(overflow == 0, 100, 15 + overflow))
+
+
+def _whole_steps(level, xp, limit):
+    """Return how often skills can be trained without gaining more than xp.
+
+    The result is capped at limit.
+    """
+    # solve steps * level + steps * (steps + 1) / 2 = xp, then correct
+    # rounding errors of the square root
+    b = 2 * level + 1
+    steps = ((np.sqrt(b * b + 8.0 * xp) - b) // 2).astype(np.int64)
+    steps = np.clip(steps, 0, limit)
+    too_many = _level_sum(level, level + steps) > xp
+    steps = np.where(too_many, steps - 1, steps)
+    too_few = (steps < limit) & (_level_sum(level, level + steps + 1) <= xp)
+    return np.where(too_few, steps + 1, steps)
+
+
+def _xp_gained(level, times):
+    """Return xp gained by training skills a number of times."""
+    overflow = np.maximum(times - (100 - level), 0)
+    cycles, rest = overflow // 85, overflow % 85
+    return np.where(level + times <= 100,
+                    _level_sum(level, level + times),
+                    _level_sum(level, 100) + cycles * _level_sum(15, 100) +
+                    _level_sum(15, 15 + rest))
+
+
+# vectorized versions of registered strategies, by mode name
+BATCH_FUNCTIONS = {"fast": calculate_fast_batch,
+                   "balanced": calculate_balanced_batch,
+                   "easy": calculate_easy_batch}
@@ -0,0 +1,198 @@
+"""Measure the hot paths of calculator and inputparser.
+
+Runs without a display. Results are written as JSON and can be compared
+against a stored baseline:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json
+
+The exit code is 1 if a benchmark got slower than the tolerance allows.
+Import times of the entry points are measured in fresh interpreters with
+-X importtime, --imports prints the slowest imports of each one.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+
+import calculator as calc
+import inputparser as p
+
+GOAL_LEVELS = (10, 50, 100, 252, 299)
+SKILL_COUNTS = (1, 4, 18)
+STARTUP_MODULES = ("main", "cli", "server", "calculator", "inputparser")
+
+
+def collect_input():
+    """Validate a complete set of input, like the GUI does."""
+    collector = p.InputCollector()
+    collector.set_char_levels(goal="252", now="12")
+    collector.set_selected_skills(list(p.GameData.SKILL_NAMES))
+    collector.set_skill_levels({skill: "42" for skill in
+                                p.GameData.SKILL_NAMES})
+    return collector
+
+
+def compare(results, baseline, tolerance):
+    """Return names of all benchmarks that got slower than allowed.
+
+    Attributes:
+        results (dict): seconds per call by benchmark name
+        baseline (dict): stored seconds per call by benchmark name
+        tolerance (float): allowed slowdown, 0.2 means 20 %
+    """
+    return [name for name in sorted(results) if name in baseline and
+            results[name] > baseline[name] * (1 + tolerance)]
+
+
+def make_benchmarks():
+    """Return a dict mapping benchmark names to argument-less functions."""
+    benchmarks = {}
+    for count in SKILL_COUNTS:
+        levels = {skill: p.GameData.NEW_CHAR_LEVEL_INFO["Breton"][skill]
+                  for skill in p.GameData.SKILL_NAMES[:count]}
+        for goal in GOAL_LEVELS:
+            for name, function in training_functions().items():
+                key = "calculator.{}/goal={}/skills={}".format(name, goal,
+                                                               count)
+                benchmarks[key] = (lambda f=function, l=levels, g=goal:
+                                   f(l, 1, g))
+
+    benchmarks["inputparser.InputCollector/validation"] = collect_input
+
+    data = calc.calculate_balanced_training(
+        collect_input().get_skill_levels(), 1, 252)
+    benchmarks["inputparser.OutputFormatter.reformat"] = (
+        lambda: p.OutputFormatter.reformat(data))
+    return benchmarks
+
+
+def import_times(module):
+    """Return {imported module: cumulative seconds} for importing module.
+
+    Runs a new interpreter with -X importtime (Python 3.7+).
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                              "import " + module],
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        try:
+            times[name.strip()] = int(cumulative) / 1e6
+        except ValueError:
+            continue  # header line
+    return times
+
+
+def import_report(modules=STARTUP_MODULES, top=10):
+    """Return text listing the slowest imports of every module."""
+    lines = []
+    for module in modules:
+        times = import_times(module)
+        lines.append("{}: {:.1f} ms".format(module,
+                                           times.get(module, 0) * 1000))
+        slowest = sorted(times.items(), key=lambda item: -item[1])
+        for name, seconds in slowest[1:top + 1]:
+            lines.append("    {:<40}{:8.1f} ms".format(name, seconds * 1000))
+    return "\n".join(lines)
+
+
+def training_functions():
+    """Return benchmarked functions of all registered strategies by name.
+
+    Strategies that pick skills one at a time are also measured stepping
+    through simulate_training.
+    """
+    functions = {}
+    for name, strategy in calc.STRATEGIES.items():
+        if strategy.selector is not None:
+            functions["simulate_{}_training".format(name)] = (
+                lambda l, c, g, s=strategy.selector:
+                calc.simulate_training(l, c, g, s()))
+        functions["calculate_{}_training".format(name)] = strategy.plan
+    return functions
+
+
+def measure(function, min_time=0.05, repeat=5):
+    """Return the best time of a single call in seconds."""
+    number = 1
+    while timeit.timeit(function, number=number) < min_time:
+        number *= 2
+    return min(timeit.repeat(function, number=number,
+                             repeat=repeat)) / number
+
+
+def run(selection=None, min_time=0.05, repeat=5):
+    """Return seconds per call for all (or all selected) benchmarks."""
+    results = {}
+    for name, function in sorted(make_benchmarks().items()):
+        if selection is None or selection in name:
+            results[name] = measure(function, min_time, repeat)
+
+    for module in STARTUP_MODULES:
+        name = "import.{}".format(module)
+        if selection is None or selection in name:
+            # the best of several runs, the first one warms up the disk
+            results[name] = min(import_times(module).get(module, 0)
+                                for _ in range(repeat))
+    return results
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--select", help="only run benchmarks containing "
+                                         "this text")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown (default: 0.25)")
+    parser.add_argument("--quick", action="store_true",
+                        help="shorter, less precise measurements")
+    parser.add_argument("--imports", action="store_true",
+                        help="only print the slowest imports of every "
+                             "entry point")
+    args = parser.parse_args(arguments)
+
+    if args.imports:
+        print(import_report())
+        return 0
+
+    if args.quick:
+        results = run(args.select, min_time=0.01, repeat=2)
+    else:
+        results = run(args.select)
+    report = {"python": platform.python_version(),
+              "machine": platform.machine(),
+              "results": results}
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as stored:
+            baseline = json.load(stored)["results"]
+        slower = compare(results, baseline, args.tolerance)
+        for name in slower:
+            sys.stderr.write("{}: {:.3g}s -> {:.3g}s\n".format(
+                name, baseline[name], results[name]))
+        if slower:
+            sys.stderr.write("{} benchmark(s) got slower.\n".format(
+                len(slower)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
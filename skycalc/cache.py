@@ -0,0 +1,180 @@
+"""Remember calculated skill training data, in memory or on disk."""
+
+import collections
+import json
+import os
+import sqlite3
+import threading
+
+import calculator as calc
+
+# stored plans with another version are ignored, increase on format changes
+PLAN_VERSION = 3
+
+
+def plan_key(skill_levels, current_level, goal_level, mode, legendary=None):
+    """Return a hashable key describing a calculation.
+
+    The skill order is kept, it decides between equally good skills.
+    Attributes:
+        skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        mode (str): name of the training mode
+        legendary: skills that may be made legendary, None allows all
+    """
+    levels = tuple((skill, int(skill_levels[skill])) for skill in skill_levels)
+    if legendary is not None:
+        legendary = tuple(skill for skill in skill_levels
+                          if skill in legendary)
+    return levels, int(current_level), int(goal_level), mode, legendary
+
+
+def copy_plan(plan):
+    """Return a copy of training data that can be changed safely."""
+    return {skill: dict(entry) for skill, entry in plan.items()}
+
+
+class DiskPlanCache:
+    """Plan store in an SQLite file that several processes can share.
+
+    Every process and thread opens its own connection. The database uses
+    write-ahead logging, so readers never wait for writers.
+    Attributes:
+        path (str): database file
+        timeout (float): seconds to wait for other writers
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.__path = path
+        self.__timeout = timeout
+        self.__local = threading.local()
+
+        connection = self.__get_connection()
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS plans "
+                               "(key TEXT PRIMARY KEY, plan TEXT NOT NULL)")
+
+    def clear(self):
+        connection = self.__get_connection()
+        with connection:
+            connection.execute("DELETE FROM plans")
+
+    def close(self):
+        """Close the connection of the calling thread."""
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.__local.connection = None
+
+    def get(self, key):
+        """Return the plan stored for key, None if unknown."""
+        row = self.__get_connection().execute(
+            "SELECT plan FROM plans WHERE key = ?",
+            (self.__encode(key),)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0], object_pairs_hook=collections.OrderedDict)
+
+    def put(self, key, plan):
+        connection = self.__get_connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO plans (key, plan) VALUES (?, ?)",
+                (self.__encode(key), json.dumps(plan)))
+
+    @staticmethod
+    def __encode(key):
+        return json.dumps([PLAN_VERSION, key])
+
+    def __get_connection(self):
+        # connections must not be shared with forked children
+        if getattr(self.__local, "pid", None) != os.getpid():
+            self.__local.connection = None
+            self.__local.pid = os.getpid()
+        if self.__local.connection is None:
+            connection = sqlite3.connect(self.__path, timeout=self.__timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.__local.connection = connection
+        return self.__local.connection
+
+
+class PlanCache:
+    """Least recently used cache in front of the calculator functions.
+
+    Callers always get their own copy of the cached data. Plans missing in
+    memory are looked up in the optional backend, new plans are written
+    through to it.
+    Attributes:
+        maxsize (int): maximum number of remembered plans
+        backend: optional persistent store, e.g. a DiskPlanCache
+    """
+
+    def __init__(self, maxsize=256, backend=None):
+        self.__maxsize = maxsize
+        self.__backend = backend
+        self.__plans = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def calculate(self, skill_levels, current_level, goal_level, mode,
+                  legendary=None):
+        """Return cached training data, calculate it if necessary."""
+        key = plan_key(skill_levels, current_level, goal_level, mode,
+                       legendary)
+        plan = self.get(key)
+        if plan is None:
+            plan = calc.MODES[mode](dict(skill_levels), current_level,
+                                    goal_level, legendary)
+            self.put(key, plan)
+        return plan
+
+    def clear(self):
+        with self.__lock:
+            self.__plans.clear()
+
+    def get(self, key):
+        """Return a copy of the plan stored for key, None if unknown."""
+        with self.__lock:
+            plan = self.__plans.get(key)
+            if plan is not None:
+                self.__plans.move_to_end(key)
+                self.__hits += 1
+                return copy_plan(plan)
+
+        plan = None if self.__backend is None else self.__backend.get(key)
+        with self.__lock:
+            if plan is None:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+        self.__remember(key, plan)
+        return copy_plan(plan)
+
+    def get_stats(self):
+        with self.__lock:
+            return {"hits": self.__hits,
+                    "misses": self.__misses,
+                    "evictions": self.__evictions,
+                    "size": len(self.__plans),
+                    "maxsize": self.__maxsize}
+
+    def put(self, key, plan):
+        self.__remember(key, plan)
+        if self.__backend is not None:
+            self.__backend.put(key, plan)
+
+    def __remember(self, key, plan):
+        with self.__lock:
+            self.__plans[key] = copy_plan(plan)
+            self.__plans.move_to_end(key)
+            while len(self.__plans) > self.__maxsize:
+                self.__plans.popitem(last=False)
+                self.__evictions += 1
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
@@ -1,75 +1,183 @@
 """Calculate optimal training strategies to reach a certain character level.
 
-3 Versions: fast, easy and balanced.
+5 Versions: fast, easy, balanced, optimal (fewest level-ups) and cheap
+(least gold spent at trainers, see trainers.py).
+The simulate_* functions train one level at a time, the calculate_* functions
+return identical data but skip ahead in arithmetic series.
 """
 
+import array
+import collections
+import collections.abc
+import heapq
+import inspect
 
-def simulate_training(original_skill_levels, current, goal, selected_from):
-    """Simulate skill training and return resulting information.
+import trainers
+
+# SKILL_XP[level]: xp gained by training a skill from 0 up to level
+SKILL_XP = tuple(level * (level + 1) // 2 for level in range(101))
+# xp gained by one legendary cycle, 16 up to 100
+CYCLE_XP = SKILL_XP[100] - SKILL_XP[15]
+
+_NO_LEGENDARY = "The goal can not be reached without more legendary skills."
+
+
+class HeapSelector:
+    """Select skills through a priority queue instead of scanning all of them.
+
+    Usable as selected_from in simulate_training. Only the last selected
+    skill changes between two calls, so it is the only one pushed back.
+    Ties are broken by skill position, like min and max do.
+    Attributes:
+        key (str): skill data entry used for the comparison
+        highest (bool): select the highest instead of the lowest entry
+    """
+
+    def __init__(self, key, highest=False):
+        self.__key = key
+        self.__sign = -1 if highest else 1
+
+        self.__heap = None
+        self.__values = None  # the compared column, updated in place
+        self.__last = None  # position selected by the last call
+
+    def __call__(self, states):
+        if self.__heap is None:
+            self.__values = values = states.column(self.__key)
+            self.__heap = [(self.__sign * values[i], i)
+                           for i in range(len(values))]
+            heapq.heapify(self.__heap)
+        elif self.__last is not None:
+            heapq.heappush(self.__heap, (self.__sign *
+                                         self.__values[self.__last],
+                                         self.__last))
+
+        _, self.__last = heapq.heappop(self.__heap)
+        return self.__last
+
+
+class Strategy:
+    """A training mode, see register.
 
+    Attributes:
+        name (str): mode name, e.g. 'fast'
+        plan: function (original_skill_levels, current_level, goal_level,
+            legendary=None) returning skill data, legendary lists the
+            skills that may be made legendary (None allows all); a
+            module-level function, so plans can be calculated in worker
+            processes. Functions without legendary are adapted by register
+            and refuse restrictions.
+        selector: optional function returning a new selected_from for
+            simulate_training, None if the mode does not pick skills one
+            training at a time
+        heap (bool): the selector picks skills through a priority queue,
+            like HeapSelector, instead of scanning all of them
+        incremental (bool): plans can be updated by replan
+    """
+
+    def __init__(self, name, plan, selector=None, heap=False,
+                 incremental=False):
+        self.name = name
+        self.plan = plan
+        self.selector = selector
+        self.heap = heap
+        self.incremental = incremental
+
+
+class SkillStates(collections.abc.Mapping):
+    """Training state of all used skills, packed into integer arrays.
+
+    Skills are addressed by their position in the original dict, the usual
+    skill data dict is only built by to_dict. Read-only, the state also
+    works like that dict: states[skill] builds the data of one skill when
+    it is looked up.
     Attributes:
         original_skill_levels: dict containing current levels of used skills.
-        current (int): current character level
-        goal (int): goal level
-        selected_from: selection method used for optimization
     """
 
-    def done(xp):
-        return xp <= 0
+    __slots__ = ("names", "start", "final", "leveled", "legendary")
 
-    def make_result_dict(original_dict):
-        """Return formatted skill data dictionary.
+    def __init__(self, original_skill_levels):
+        self.names = tuple(original_skill_levels)
+        self.start = array.array("B", (original_skill_levels[skill]
+                                       for skill in self.names))
+        self.final = array.array("B", self.start)
+        self.leveled = array.array("l", [0]) * len(self.names)
+        self.legendary = array.array("l", self.leveled)
 
-        Attributes:
-            original_dict: dict containing current levels of used skills.
-        """
+    def column(self, key):
+        """Return the array holding a skill data entry, e.g. 'Final Level'."""
+        return {"Start Level": self.start,
+                "Times Leveled": self.leveled,
+                "Times Legendary": self.legendary,
+                "Final Level": self.final}[key]
 
-        def reformat(entry):
-            """Reformat dictionary entry."""
-            return {"Start Level": original_dict[entry],
-                    "Times Leveled": 0,
-                    "Times Legendary": 0,
-                    "Final Level": original_dict[entry]}
+    def __getitem__(self, skill):
+        i = self.position(skill)
+        return {"Start Level": self.start[i],
+                "Times Leveled": self.leveled[i],
+                "Times Legendary": self.legendary[i],
+                "Final Level": self.final[i]}
 
-        return {entry: reformat(entry) for entry in original_dict}
+    def __iter__(self):
+        return iter(self.names)
 
-    def total_xp(current_lvl, goal_lvl):
-        """Return xp needed to advance from a current level to a goal level.
+    def __len__(self):
+        return len(self.names)
 
-        Attributes:
-            current_lvl (int): current character level
-            goal_lvl (int): goal level
-        """
+    def position(self, skill):
+        """Return the position of a skill, raise KeyError if it is unused."""
+        try:
+            return self.names.index(skill)
+        except ValueError:
+            raise KeyError(skill)
 
-        def level_up_xp(level):
-            """Return xp needed for next level-up at a given level."""
-            return (level + 3) * 25
+    def to_dict(self):
+        """Return formatted skill data dictionary."""
+        return {self.names[i]: {"Start Level": self.start[i],
+                                "Times Leveled": self.leveled[i],
+                                "Times Legendary": self.legendary[i],
+                                "Final Level": self.final[i]}
+                for i in range(len(self.names))}
 
-        return sum(level_up_xp(lvl) for lvl in range(current_lvl, goal_lvl))
+    def train(self, i):
+        """Update the state as if a skill was trained, return its level."""
+        if self.final[i] == 100:  # 'make legendary'
+            self.final[i] = 16
+            self.legendary[i] += 1
+        else:
+            self.final[i] += 1
+        self.leveled[i] += 1
+        return self.final[i]
 
-    # TODO: get rid of side effects
-    def train(data, skill):
-        """Update data as if a skill was trained."""
 
-        def trained(skill_level):
-            """Return level reached by training a skill with a given level."""
-            if skill_level == 100:  # 'make legendary'
-                return 16
-            else:
-                return skill_level + 1
+def simulate_training(original_skill_levels, current, goal, selected_from):
+    """Simulate skill training and return resulting information.
 
-        data[skill]["Final Level"] = trained(data[skill]["Final Level"])
-        data[skill]["Times Leveled"] += 1
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current (int): current character level
+        goal (int): goal level
+        selected_from: selection method used for optimization, gets the
+            SkillStates and returns the position of the skill to train.
+            Selectors written for the skill data dict work as well, they
+            may look skills up by name and return the name.
+    """
+    return train_skills(original_skill_levels, current, goal,
+                        selected_from).to_dict()
 
-    # TODO: make 'prettier'
-    needed_xp = total_xp(current, goal)
-    skill_data = make_result_dict(original_skill_levels)
 
-    while not done(needed_xp):
-        selected_skill = selected_from(skill_data)
-        train(skill_data, selected_skill)
-        needed_xp -= skill_data[selected_skill]["Final Level"]
-    return skill_data
+def train_skills(original_skill_levels, current, goal, selected_from):
+    """Like simulate_training, but return the compact SkillStates."""
+    needed_xp = character_xp(current, goal)
+    states = SkillStates(original_skill_levels)
+
+    while needed_xp > 0:
+        selected = selected_from(states)
+        if isinstance(selected, str):
+            selected = states.position(selected)
+        needed_xp -= states.train(selected)
+    return states
 
 
 def simulate_balanced_training(original_skill_levels,
@@ -83,14 +191,9 @@ def simulate_balanced_training(original_skill_levels,
         goal_level (int): goal level
     """
 
-    def least_leveled(skill_dict):
-        """Return the skill that was trained least."""
-        stripped_dict = {s: skill_dict[s]["Times Leveled"] for s in skill_dict}
-        return min(stripped_dict, key=stripped_dict.get)
-
     return simulate_training(original_skill_levels,
                              current_level, goal_level,
-                             least_leveled)
+                             STRATEGIES["balanced"].selector())
 
 
 def simulate_easy_training(original_skill_levels, current_level, goal_level):
@@ -103,14 +206,9 @@ def simulate_easy_training(original_skill_levels, current_level, goal_level):
         goal_level (int): goal level
     """
 
-    def lowest(skill_dict):
-        """Return the skill with the lowest final level."""
-        stripped_dict = {s: skill_dict[s]["Final Level"] for s in skill_dict}
-        return min(stripped_dict, key=stripped_dict.get)
-
     return simulate_training(original_skill_levels,
                              current_level, goal_level,
-                             lowest)
+                             STRATEGIES["easy"].selector())
 
 
 def simulate_fast_training(original_skill_levels, current_level, goal_level):
@@ -123,14 +221,901 @@ def simulate_fast_training(original_skill_levels, current_level, goal_level):
         goal_level (int): goal level
     """
 
-    def highest(skill_dict):
-        """Return the skill with the highest final level."""
-        stripped_dict = {s: skill_dict[s]["Final Level"] for s in skill_dict}
-        return max(stripped_dict, key=stripped_dict.get)
-
     return simulate_training(original_skill_levels,
                              current_level, goal_level,
-                             highest)
+                             STRATEGIES["fast"].selector())
+
+
+def calculate_balanced_training(original_skill_levels,
+                                current_level, goal_level, legendary=None):
+    """Return the same data as simulate_balanced_training, without stepping.
+
+    Skills are trained round-robin, so whole rounds are skipped at once.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        legendary: skills that may be made legendary, None allows all
+    """
+    names = list(original_skill_levels)
+    start = [original_skill_levels[s] for s in names]
+    times = [0] * len(start)
+    _train_balanced(start, times, character_xp(current_level, goal_level),
+                    _allowed(names, legendary))
+    final = [trained_level(start[i], times[i]) for i in range(len(start))]
+    return _result_dict(names, start, final, times)
+
+
+def calculate_easy_training(original_skill_levels, current_level, goal_level,
+                            legendary=None):
+    """Return the same data as simulate_easy_training, without stepping.
+
+    All skills sharing the lowest level are raised together.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        legendary: skills that may be made legendary, None allows all
+    """
+    names = list(original_skill_levels)
+    start = [original_skill_levels[s] for s in names]
+    final = list(start)
+    wraps = [0] * len(start)
+    _train_easy(final, wraps, character_xp(current_level, goal_level),
+                _allowed(names, legendary))
+
+    times = [final[i] - start[i] + 85 * wraps[i] for i in range(len(start))]
+    return _result_dict(names, start, final, times)
+
+
+def calculate_fast_training(original_skill_levels, current_level, goal_level,
+                            legendary=None):
+    """Return the same data as simulate_fast_training, without stepping.
+
+    The highest skill is trained up to 100 in a single step, legendary
+    cycles of a skill that is selected again after its reset are skipped
+    all at once.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        legendary: skills that may be made legendary, None allows all
+    """
+    names = list(original_skill_levels)
+    start = [original_skill_levels[s] for s in names]
+    final = list(start)
+    wraps = [0] * len(start)
+    _train_fast(final, wraps, character_xp(current_level, goal_level),
+                _allowed(names, legendary))
+
+    times = [final[i] - start[i] + 85 * wraps[i] for i in range(len(start))]
+    return _result_dict(names, start, final, times)
+
+
+def calculate_optimal_training(original_skill_levels,
+                               current_level, goal_level, legendary=None):
+    """Return skill training data needing the fewest possible level-ups.
+
+    See optimal_training.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        legendary: skills that may be made legendary, None allows all
+    """
+    return optimal_training(original_skill_levels, current_level,
+                            goal_level, legendary)[0]
+
+
+def optimal_training(original_skill_levels, current_level, goal_level,
+                     legendary=None):
+    """Return (training data, minimum) for the fewest possible level-ups.
+
+    No plan reaches the goal with less than minimum level-ups in total, the
+    returned plan needs exactly that many. Only the number of trainings
+    per skill matters, not their order, and there is an optimal plan that
+    stops inside a run of rising levels for at most one skill (moving the
+    lower of two such trainings to the other skill never loses xp). Every
+    skill is thus either untrained, trained to 100 (its 'leg'), trained on
+    through legendary resets or the one partly trained skill.
+    - If all legs together give less xp than needed, every leg is trained
+      and the rest comes from legendary cycles, which are the same for all
+      skills: completing a leg never gains less xp per training than a
+      cycle does. They go to the first skill allowed to go legendary.
+    - Otherwise no cycle is needed. The legs are chosen by a 0/1 knapsack
+      over the number of trainings, plus one partly trained leg, which is
+      tried for every distinct start level.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        legendary: skills that may be made legendary, None allows all
+    """
+    names = list(original_skill_levels)
+    start = [original_skill_levels[s] for s in names]
+    allowed = _allowed(names, legendary)
+    legs = [100 - level for level in start]
+    needed = character_xp(current_level, goal_level)
+    times = [0] * len(start)
+    all_legs = sum(_level_sum(level, 100) for level in start)
+
+    if needed > all_legs:
+        # all legs, then whole cycles and the start of one more cycle
+        if allowed is not None and not any(allowed):
+            raise ValueError(_NO_LEGENDARY)
+        cycles, rest = divmod(needed - all_legs - 1, CYCLE_XP)
+        times = list(legs)
+        cycling = 0 if allowed is None else allowed.index(True)
+        times[cycling] += 85 * cycles + _steps_needed(15, rest + 1)
+    elif needed > 0:
+        best = None  # (trainings, partly trained position, trained legs)
+        for partial in sorted({start.index(level) for level in start}):
+            others = [i for i in range(len(start)) if i != partial]
+            gains = _best_legs(start, others, sum(legs))
+            for count in range(len(gains)):
+                missing = needed - gains[count]
+                if gains[count] < 0 or missing > _level_sum(start[partial],
+                                                            100):
+                    continue
+                total = count + (_steps_needed(start[partial], missing)
+                                 if missing > 0 else 0)
+                if best is None or total < best[0]:
+                    best = (total, partial, others, count)
+
+        total, partial, others, count = best
+        for i in _chosen_legs(start, others, count):
+            times[i] = legs[i]
+        if total > count:
+            times[partial] = total - count
+
+    final = [trained_level(start[i], times[i]) for i in range(len(start))]
+    return _result_dict(names, start, final, times), sum(times)
+
+
+def calculate_cheap_training(original_skill_levels,
+                             current_level, goal_level, legendary=None):
+    """Return skill training data costing the least gold at trainers.
+
+    See cheapest_training.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        legendary: skills that may be made legendary, None allows all
+    """
+    return cheapest_training(original_skill_levels, current_level,
+                             goal_level, legendary=legendary)
+
+
+def cheapest_training(original_skill_levels, current_level, goal_level,
+                      prices=None, legendary=None):
+    """Return skill training data for buying levels as cheaply as possible.
+
+    Only the number of trainings per skill matters, so the cheapest plan
+    is found by dynamic programming over the skills, every number of
+    trainings of a skill being one choice (its gold from the PriceTable
+    prefix sums). Among the cheapest plans one with the fewest trainings
+    is returned.
+    Trainers sell trainers.training_cap trainings on the way to the goal.
+    If a plan keeps that cap, the search covers (trainings, xp) and the
+    plan is the cheapest one within the cap. Otherwise the cheapest plan
+    at all is returned, the trainings over the cap have to be practiced.
+    Full legendary cycles (16 -> 100 -> 16) cost the same for every skill
+    then, so they are counted separately and the search only covers xp.
+    Attributes:
+        original_skill_levels: dict containing current levels of used skills.
+        current_level (int): current character level
+        goal_level (int): goal level
+        prices: trainers.PriceTable, defaults to trainers.DEFAULT_PRICES
+        legendary: skills that may be made legendary, None allows all
+    """
+    if prices is None:
+        prices = trainers.DEFAULT_PRICES
+    names = list(original_skill_levels)
+    start = [original_skill_levels[s] for s in names]
+    allowed = _allowed(names, legendary) or [True] * len(start)
+    needed = character_xp(current_level, goal_level)
+    cap = trainers.training_cap(current_level, goal_level)
+
+    if needed <= 0:
+        times = [0] * len(start)
+    elif optimal_training(original_skill_levels, current_level, goal_level,
+                          legendary)[1] <= cap:
+        times = _cheapest_within_cap(start, needed, cap, prices, allowed)
+    else:
+        times = _cheapest_overall(start, needed, prices, allowed)
+    final = [trained_level(start[i], times[i]) for i in range(len(start))]
+    return _result_dict(names, start, final, times)
+
+
+def register(strategy):
+    """Add a Strategy, or replace the one with the same name.
+
+    Registered modes are offered by the GUI, the CLI, the server and the
+    benchmarks, in registration order. MODES always takes legendary.
+    """
+    STRATEGIES[strategy.name] = strategy
+    plan = strategy.plan
+    try:
+        inspect.signature(plan).bind({}, 1, 2, None)
+    except TypeError:
+        plan = _AllLegendary(plan)
+    except ValueError:
+        pass  # no signature, e.g. a builtin, trust the documentation
+    MODES[strategy.name] = plan
+
+
+class _AllLegendary:
+    """Plan function for a plan that can not restrict legendary skills."""
+
+    def __init__(self, plan):
+        self.plan = plan
+
+    def __call__(self, original_skill_levels, current_level, goal_level,
+                 legendary=None):
+        if legendary is not None and any(skill not in legendary for skill
+                                         in original_skill_levels):
+            raise ValueError("This mode can not forbid legendary skills.")
+        return self.plan(original_skill_levels, current_level, goal_level)
+
+
+def extend_training(plan, current_level, goal_level, mode):
+    """Return training data for a higher goal, continuing an existing plan.
+
+    The plan is resumed from its final state instead of being replayed,
+    the result equals a new calculation for goal_level.
+    Attributes:
+        plan: skill training data calculated by mode for a lower goal
+        current_level (int): current character level
+        goal_level (int): new goal level
+        mode (str): name of the training mode
+    """
+    names = list(plan)
+    start = [plan[s]["Start Level"] for s in names]
+    times = [plan[s]["Times Leveled"] for s in names]
+    remaining = character_xp(current_level, goal_level) - sum(
+        skill_xp(start[i], times[i]) for i in range(len(start)))
+    return _resume(mode, names, start, times, remaining)
+
+
+def change_skill_level(plan, current_level, goal_level, mode, skill, level):
+    """Return training data after the start level of one skill changed.
+
+    Only the training from the first step the skill takes part in is
+    calculated again, the result equals a new calculation.
+    Attributes:
+        plan: skill training data calculated by mode
+        current_level (int): current character level
+        goal_level (int): goal level
+        mode (str): name of the training mode
+        skill (str): skill whose start level changed
+        level (int): new start level
+    """
+    names = list(plan)
+    start = [plan[s]["Start Level"] for s in names]
+    times = [plan[s]["Times Leveled"] for s in names]
+    changed = names.index(skill)
+    old, start[changed] = start[changed], level
+    needed = character_xp(current_level, goal_level)
+
+    if mode == "balanced":
+        # the round-robin order does not depend on levels, only the step
+        # the goal is reached at moves
+        gained = sum(skill_xp(start[i], times[i]) for i in range(len(start)))
+        while True:
+            i = _last_balanced_step(times)
+            if i is None:
+                break
+            gain = trained_level(start[i], times[i])
+            if gained - gain < needed:
+                break
+            times[i] -= 1
+            gained -= gain
+        return _resume(mode, names, start, times, needed - gained)
+
+    # train the skills that come before the changed one in both plans,
+    # then resume from that state
+    times = [0] * len(start)
+    if mode == "easy":
+        lowest = min(old, level)
+        before = [i for i in range(len(start))
+                  if i != changed and start[i] < lowest]
+        for i in before:
+            times[i] = lowest - start[i]
+        gained = sum(_level_sum(start[i], lowest) for i in before)
+    else:
+        highest = max(old, level)
+        if highest <= 16:
+            return calculate_fast_training(
+                dict(zip(names, start)), current_level, goal_level)
+        before = [i for i in range(len(start)) if i != changed and
+                  (start[i], -i) > (highest, -changed)]
+        for i in before:
+            times[i] = 100 - start[i] + 1
+        gained = sum(_level_sum(start[i], 100) + 16 for i in before)
+
+    if gained >= needed:
+        # the goal is reached before, the skill is not trained at all
+        plan = {s: dict(plan[s]) for s in names}
+        plan[skill]["Start Level"] = plan[skill]["Final Level"] = level
+        return plan
+    return _resume(mode, names, start, times, needed - gained)
+
+
+def replan(plan, mode, old_input, new_input):
+    """Return training data for changed input, None if that is no update.
+
+    Supported updates are a higher goal or one changed skill level of an
+    incremental strategy (fast, balanced, easy), for anything else the plan
+    has to be calculated again. Plans must allow all skills to go
+    legendary.
+    Attributes:
+        plan: skill training data calculated by mode for old_input
+        mode (str): name of the training mode
+        old_input: (skill levels, current level, goal level) of the plan
+        new_input: (skill levels, current level, goal level)
+    """
+    old_levels, old_current, old_goal = old_input
+    levels, current, goal = new_input
+    if not STRATEGIES[mode].incremental:
+        return None
+    if list(old_levels) != list(levels) or old_current != current:
+        return None
+
+    changed = [skill for skill in levels if levels[skill] != old_levels[skill]]
+    if not changed and goal >= old_goal:
+        return extend_training(plan, current, goal, mode)
+    if len(changed) == 1 and goal == old_goal:
+        return change_skill_level(plan, current, goal, mode, changed[0],
+                                  levels[changed[0]])
+    return None
+
+
+def character_xp(current_level, goal_level):
+    """Return xp needed to advance from a current level to a goal level.
+
+    Closed form of the sum over all level-ups, each needing
+    (level + 3) * 25 xp.
+    Attributes:
+        current_level (int): current character level
+        goal_level (int): goal level
+    """
+    if goal_level <= current_level:
+        return 0
+    levels = goal_level - current_level
+    return 25 * (levels * (current_level + goal_level - 1) // 2 + 3 * levels)
+
+
+def skill_xp(level, times):
+    """Return xp gained by training a skill a number of times.
+
+    Legendary resets (100 -> 16) are included.
+    Attributes:
+        level (int): current skill level
+        times (int): number of trainings
+    """
+    if level + times <= 100:
+        return SKILL_XP[level + times] - SKILL_XP[level]
+    cycles, rest = divmod(times - (100 - level), 85)
+    return (SKILL_XP[100] - SKILL_XP[level] + cycles * CYCLE_XP +
+            SKILL_XP[15 + rest] - SKILL_XP[15])
+
+
+def trained_level(level, times):
+    """Return level reached by training a skill a number of times.
+
+    Attributes:
+        level (int): current skill level
+        times (int): number of trainings
+    """
+    if level + times <= 100:
+        return level + times
+    overflow = (times - (100 - level)) % 85  # one cycle: 16, 17, ..., 100
+    return 100 if overflow == 0 else 15 + overflow
+
+
+def times_legendary(level, times):
+    """Return how often a skill is made legendary by training it.
+
+    Attributes:
+        level (int): current skill level
+        times (int): number of trainings
+    """
+    if level + times <= 100:
+        return 0
+    return (times - (100 - level) - 1) // 85 + 1
+
+
+def _level_sum(level, goal):
+    """Return xp gained by training a skill from level to goal (<= 100)."""
+    return SKILL_XP[goal] - SKILL_XP[level]
+
+
+def _allowed(names, legendary):
+    """Return per position if a skill may go legendary, None for all."""
+    if legendary is None:
+        return None
+    return [skill in legendary for skill in names]
+
+
+def _best_legs(start, skills, size):
+    """Return the most xp gained by training legs exactly count times.
+
+    A leg trains a skill up to 100. The result is indexed by the total
+    number of trainings, -1 marks counts no combination of legs adds up to.
+    Attributes:
+        start: start levels of all skills
+        skills: positions of the skills that may be trained
+        size (int): highest number of trainings of interest
+    """
+    gains = [0] + [-1] * size
+    for i in skills:
+        gains = _with_leg(gains, start[i])
+    return gains
+
+
+def _cheapest_overall(start, needed, prices, allowed):
+    """Return trainings per skill gaining needed xp for the least gold.
+
+    A skill is trained up to its first reset and then through whole
+    legendary cycles plus a rest, or not reset at all. The cycles are
+    the same for every skill that was reset, only the rest is searched.
+    The search only tries choices that a Lagrangian lower bound allows
+    below a guessed price. If the cheapest plan found costs more than the
+    guess, its price is the next guess, a plan costing at most the guess
+    leaves out no cheaper plan.
+    """
+    cycle_gold = prices.price(16, 85)
+    # choices[i]: (trainings, xp, gold, reset) of skill i without cycles
+    choices = []
+    for i, level in enumerate(start):
+        choices.append([(times, skill_xp(level, times),
+                         prices.price(level, times), times > 100 - level)
+                        for times in range(1, 101 - level + 85 * allowed[i])])
+
+    lowest, bounds, cycle_bounds = _gold_bounds(choices, needed, cycle_gold)
+    gap = max(lowest * 2 ** -14, 1)
+    upper = lowest + gap
+    while True:
+        kept = [[option for option, bound in zip(options, bounds[i])
+                 if bound <= upper] for i, options in enumerate(choices)]
+        cycles = [count for count, bound in enumerate(cycle_bounds)
+                  if bound <= upper]
+        complete = len(cycles) == len(cycle_bounds) and all(
+            len(kept[i]) == len(choices[i]) for i in range(len(choices)))
+        gold, times = _least_gold(kept, needed, cycle_gold, cycles)
+        if gold is not None and (gold <= upper or complete):
+            return times
+        if complete:
+            raise ValueError(_NO_LEGENDARY)
+        if gold is None:
+            gap *= 16
+            upper = lowest + gap
+        else:
+            upper = gold
+
+
+def _gold_bounds(choices, needed, cycle_gold):
+    """Return lower bounds of the gold: of all plans, of plans with each
+    choice and of plans with each number of cycles.
+
+    For every multiplier m >= 0 a plan costs at least its gold minus m
+    times its xp surplus, which is minimized skill by skill. m is chosen
+    by bisection to make that bound as high as possible.
+    """
+    import numpy as np
+
+    # gold[i][j], xp[i][j]: choice j of skill i, choice 0 is no training
+    width = max(len(options) for options in choices) + 1
+    gold = np.zeros((len(choices), width))
+    xp = np.zeros((len(choices), width))
+    valid = np.zeros((len(choices), width), dtype=bool)
+    valid[:, 0] = True
+    for i, options in enumerate(choices):
+        for j, (_, gained, price, _) in enumerate(options, 1):
+            gold[i, j], xp[i, j], valid[i, j] = price, gained, True
+    most_cycles = -(-needed // CYCLE_XP)
+
+    def relaxed(m):
+        reduced = np.where(valid, gold - m * xp, np.inf)
+        cycles = most_cycles if cycle_gold < m * CYCLE_XP else 0
+        bound = (reduced.min(axis=1).sum() + m * needed +
+                 cycles * (cycle_gold - m * CYCLE_XP))
+        gained = (xp[np.arange(len(choices)), reduced.argmin(axis=1)].sum() +
+                  cycles * CYCLE_XP)
+        return bound, reduced, gained
+
+    low, high = 0.0, float(gold.max() + cycle_gold)
+    for _ in range(64):
+        middle = (low + high) / 2
+        if relaxed(middle)[2] < needed:
+            low = middle
+        else:
+            high = middle
+    m = max(low, high, key=lambda m: relaxed(m)[0])
+    bound, reduced, _ = relaxed(m)
+    # forcing a choice or a number of cycles replaces its best term
+    forced = bound + reduced - reduced.min(axis=1)[:, None]
+    cycle_terms = (cycle_gold - m * CYCLE_XP) * np.arange(
+        most_cycles + 1)
+    forced_cycles = bound + cycle_terms - cycle_terms.min()
+    # rounding must never drop a choice
+    forced[valid] -= 1e-9 * abs(forced[valid]) + 1
+    forced_cycles -= 1e-9 * abs(forced_cycles) + 1
+    return bound, [forced[i, 1:len(options) + 1]
+                   for i, options in enumerate(choices)], forced_cycles
+
+
+def _least_gold(choices, needed, cycle_gold, cycles):
+    """Return (gold, trainings per skill) of the cheapest plan.
+
+    Attributes:
+        choices: (trainings, xp, gold, reset) per skill, without cycles
+        needed (int): xp to gain
+        cycle_gold (int): gold of a legendary cycle
+        cycles: numbers of legendary cycles to try
+    Returns (None, None) if no plan gains needed xp.
+    """
+    import numpy as np
+
+    if not cycles:
+        return None, None
+    # the xp the cycles leave to the choices
+    size = min(max(needed - min(cycles) * CYCLE_XP, 0),
+               sum(max([0] + [xp for _, xp, _, _ in options])
+                   for options in choices))
+
+    # best[reset][xp]: least gold * 2 ** 12 + trainings gaining at least
+    # xp, reset tells if some skill was reset
+    shift = 2 ** 12
+    infinite = 2 ** 60
+    best = np.full((2, size + 1), infinite, dtype=np.int64)
+    best[0, 0] = 0
+    # reach[reset]: most xp gained so far, -1 if there is no such plan;
+    # best is infinite above it, so only the lower part is updated
+    reach = [0, -1]
+    picks = []
+    candidate = np.empty(size + 1, dtype=np.int64)
+    reached = np.empty(size + 1, dtype=bool)
+    better = np.empty(size + 1, dtype=bool)
+    for options in choices:
+        new = best.copy()
+        # pick[reset][xp]: option taken; came_reset[xp]: reset flag before
+        # the option that reset the skill
+        pick = np.zeros((2, size + 1), dtype=np.int16)
+        came_reset = np.zeros(size + 1, dtype=bool)
+        either = np.minimum(best[0], best[1])
+        from_reset = best[1] <= best[0]
+        new_reach = list(reach)
+        for number, (times, xp, gold, reset) in enumerate(options, 1):
+            xp = min(xp, size)
+            value = gold * shift + times
+            if reset:
+                sources = [(either, max(reach), 1)]
+            else:
+                sources = [(best[0], reach[0], 0), (best[1], reach[1], 1)]
+            for before, most, after in sources:
+                if most < 0:
+                    continue
+                end = min(size, most + xp) + 1
+                new_reach[after] = max(new_reach[after], end - 1)
+                np.add(before[:end - xp], value, out=candidate[xp:end])
+                candidate[:xp] = before[0] + value
+                np.less(candidate[:end], new[after, :end], out=better[:end])
+                np.copyto(new[after, :end], candidate[:end],
+                          where=better[:end])
+                np.copyto(pick[after, :end], number, where=better[:end])
+                if reset:
+                    reached[xp:end] = from_reset[:end - xp]
+                    reached[:xp] = from_reset[0]
+                    np.copyto(came_reset[:end], reached[:end],
+                              where=better[:end])
+        picks.append((pick, came_reset))
+        best = new
+        reach = new_reach
+
+    # the first xp are gained by cycles, the rest by the choices
+    result = None
+    for count in cycles:
+        rest = max(needed - count * CYCLE_XP, 0)
+        if rest > size:
+            continue
+        for reset in ((0, 1) if count == 0 else (1,)):
+            if best[reset, rest] >= infinite:
+                continue
+            gold, times = divmod(int(best[reset, rest]), shift)
+            key = (gold + count * cycle_gold, times + 85 * count)
+            if result is None or key < result[0]:
+                result = key, count, reset, rest
+    if result is None:
+        return None, None
+
+    (gold, _), count, reset, xp = result
+    times = [0] * len(choices)
+    for i in range(len(choices) - 1, -1, -1):
+        pick, came_reset = picks[i]
+        number = int(pick[reset, xp])
+        if number == 0:
+            continue
+        times[i], gained, _, was_reset = choices[i][number - 1]
+        if was_reset:
+            if count:
+                times[i] += 85 * count
+                count = 0
+            reset = int(came_reset[xp])
+        xp = max(xp - min(gained, size), 0)
+    return gold, times
+
+
+def _cheapest_within_cap(start, needed, cap, prices, allowed):
+    """Return at most cap trainings per skill gaining needed xp cheaply."""
+    import numpy as np
+
+    # best[count][xp]: least gold of at most count trainings gaining at
+    # least xp
+    infinite = 2 ** 30
+    best = np.full((cap + 1, needed + 1), infinite, dtype=np.int32)
+    best[:, 0] = 0
+    picks = []
+    candidate = np.empty_like(best)
+    better = np.empty(best.shape, dtype=bool)
+    for i, level in enumerate(start):
+        most = cap if allowed[i] else min(cap, 100 - level)
+        new = best.copy()
+        pick = np.zeros(best.shape, dtype=np.uint8 if cap < 256 else np.int16)
+        for times in range(1, most + 1):
+            xp = min(skill_xp(level, times), needed)
+            gold = prices.price(level, times)
+            rows = cap + 1 - times
+            np.add(best[:rows, :needed + 1 - xp], gold,
+                   out=candidate[:rows, xp:])
+            np.add(best[:rows, :1], gold, out=candidate[:rows, :xp])
+            np.less(candidate[:rows], new[times:], out=better[:rows])
+            np.copyto(new[times:], candidate[:rows], where=better[:rows])
+            np.copyto(pick[times:], times, where=better[:rows])
+        picks.append(pick)
+        best = new
+
+    # the fewest trainings reaching the least gold
+    count = int(np.argmin(best[:, needed]))
+    xp = needed
+    times = [0] * len(start)
+    for i in range(len(start) - 1, -1, -1):
+        times[i] = int(picks[i][count, xp])
+        count -= times[i]
+        xp = max(xp - skill_xp(start[i], times[i]), 0)
+    return times
+
+
+def _chosen_legs(start, skills, count):
+    """Return positions of legs giving the most xp with count trainings."""
+    tables = [[0] + [-1] * count]
+    for i in skills:
+        tables.append(_with_leg(tables[-1], start[i]))
+
+    chosen = []
+    for position in range(len(skills), 0, -1):
+        if tables[position][count] != tables[position - 1][count]:
+            chosen.append(skills[position - 1])
+            count -= 100 - start[skills[position - 1]]
+    return chosen
+
+
+def _with_leg(gains, level):
+    """Return best xp per training count if one more leg can be trained."""
+    leg, xp = 100 - level, _level_sum(level, 100)
+    if leg == 0:
+        return gains
+    return gains[:leg] + [gained if previous < 0 else max(gained,
+                                                          previous + xp)
+                          for gained, previous in zip(gains[leg:], gains)]
+
+
+def _last_balanced_step(times):
+    """Return the position trained last by round-robin, None if none was."""
+    highest = max(times)
+    if highest == 0:
+        return None
+    if min(times) == highest:
+        return len(times) - 1
+    return times.index(highest - 1) - 1
+
+
+def _result_dict(names, start, final, times):
+    """Return skill data in the format used by simulate_training."""
+    return {names[i]: {"Start Level": start[i],
+                       "Times Leveled": times[i],
+                       "Times Legendary": times_legendary(start[i], times[i]),
+                       "Final Level": final[i]}
+            for i in range(len(names))}
+
+
+def _resume(mode, names, start, times, remaining):
+    """Continue training from the state reached by training times."""
+    if mode == "balanced":
+        _train_balanced(start, times, remaining)
+    else:
+        final = [trained_level(start[i], times[i]) for i in range(len(start))]
+        wraps = [(times[i] - final[i] + start[i]) // 85
+                 for i in range(len(start))]
+        if mode == "easy":
+            _train_easy(final, wraps, remaining)
+        else:
+            _train_fast(final, wraps, remaining)
+        times = [final[i] - start[i] + 85 * wraps[i]
+                 for i in range(len(start))]
+    final = [trained_level(start[i], times[i]) for i in range(len(start))]
+    return _result_dict(names, start, final, times)
+
+
+def _steps_needed(level, xp):
+    """Return how often a skill has to be trained to gain at least xp.
+
+    The skill must not reach 100 on the way.
+    """
+    low, high = 1, 100 - level
+    while low < high:
+        middle = (low + high) // 2
+        if _level_sum(level, level + middle) < xp:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _train_balanced(start, times, remaining, allowed=None):
+    """Train round-robin until remaining xp are gained, updates times.
+
+    Skills that may not go legendary drop out of the rounds at 100.
+    """
+    if remaining <= 0:
+        return
+    # limits[i]: most trainings of a skill, None if it may go legendary
+    limits = [None if allowed is None or allowed[i] else 100 - start[i]
+              for i in range(len(start))]
+
+    def open_skills():
+        return [i for i in range(len(times))
+                if limits[i] is None or times[i] < limits[i]]
+
+    # finish the round in progress, it trains the skills trained least
+    trainable = open_skills()
+    if not trainable:
+        raise ValueError(_NO_LEGENDARY)
+    fewest = min(times[i] for i in trainable)
+    if max(times[i] for i in trainable) > fewest:
+        for i in trainable:
+            if times[i] == fewest:
+                times[i] += 1
+                remaining -= trained_level(start[i], times[i])
+                if remaining <= 0:
+                    return
+
+    levels = [trained_level(start[i], times[i]) for i in range(len(start))]
+
+    def rounds_of(i, rounds):
+        if limits[i] is None:
+            return rounds
+        return max(min(rounds, limits[i] - times[i]), 0)
+
+    def round_xp(rounds):
+        return sum(skill_xp(levels[i], rounds_of(i, rounds))
+                   for i in range(len(levels)))
+
+    if all(limit is not None for limit in limits):
+        if round_xp(100) < remaining:
+            raise ValueError(_NO_LEGENDARY)
+
+    # find the number of complete rounds that still leaves xp to gain
+    low, high = 0, remaining // 16 + 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if round_xp(middle) < remaining:
+            low = middle
+        else:
+            high = middle - 1
+    remaining -= round_xp(low)
+
+    for i in range(len(times)):
+        times[i] += rounds_of(i, low)
+    for i in open_skills():
+        times[i] += 1
+        remaining -= trained_level(start[i], times[i])
+        if remaining <= 0:
+            break
+
+
+def _train_easy(final, wraps, remaining, allowed=None):
+    """Train the lowest skills until remaining xp are gained.
+
+    Updates final levels and legendary resets. Once every skill is maxed,
+    the first skill allowed to go legendary runs through whole cycles.
+    """
+    while remaining > 0:
+        lowest = min(final)
+        tier = [i for i in range(len(final)) if final[i] == lowest]
+        if lowest == 100:  # everything is maxed, first skill goes legendary
+            if allowed is not None:
+                tier = [i for i in tier if allowed[i]]
+                if not tier:
+                    raise ValueError(_NO_LEGENDARY)
+            # skip cycles that end at 100 again
+            cycles = (remaining - 1) // CYCLE_XP
+            wraps[tier[0]] += cycles
+            remaining -= cycles * CYCLE_XP
+
+            final[tier[0]] = 16
+            wraps[tier[0]] += 1
+            remaining -= 16
+            continue
+
+        # raise the whole tier, level by level, until another tier is reached
+        others = [level for level in final if level != lowest]
+        ceiling = min(others) if others else 100
+        gain = _level_sum(lowest, ceiling) * len(tier)
+        if gain < remaining:
+            for i in tier:
+                final[i] = ceiling
+            remaining -= gain
+            continue
+
+        # the goal is reached somewhere inside this tier
+        level = lowest
+        while remaining > len(tier) * (level + 1):
+            remaining -= len(tier) * (level + 1)
+            level += 1
+        steps = -(-remaining // (level + 1))
+        for position, i in enumerate(tier):
+            final[i] = level + 1 if position < steps else level
+        remaining = 0
+
+
+def _train_fast(final, wraps, remaining, allowed=None):
+    """Train the highest skill until remaining xp are gained.
+
+    Updates final levels and legendary resets. Skills that may not go
+    legendary are passed over at 100.
+    """
+    while remaining > 0:
+        trainable = [i for i in range(len(final)) if final[i] < 100 or
+                     allowed is None or allowed[i]]
+        if not trainable:
+            raise ValueError(_NO_LEGENDARY)
+        selected = max(trainable, key=lambda i: (final[i], -i))
+        level = final[selected]
+        if level == 100:  # 'make legendary'
+            # the skill is selected again after the reset if no other
+            # skill is higher, then whole cycles end at 100 again
+            if all(final[i] < 16 or (final[i] == 16 and i > selected)
+                   for i in trainable if i != selected):
+                cycles = (remaining - 1) // CYCLE_XP
+                wraps[selected] += cycles
+                remaining -= cycles * CYCLE_XP
+            final[selected] = 16
+            wraps[selected] += 1
+            remaining -= 16
+        elif _level_sum(level, 100) < remaining:
+            final[selected] = 100
+            remaining -= _level_sum(level, 100)
+        else:
+            final[selected] += _steps_needed(level, remaining)
+            remaining = 0
+
+
+STRATEGIES = collections.OrderedDict()  # name: Strategy
+MODES = collections.OrderedDict()  # name: plan function of every strategy
+
+register(Strategy("fast", calculate_fast_training,
+                  lambda: HeapSelector("Final Level", highest=True),
+                  heap=True, incremental=True))
+register(Strategy("balanced", calculate_balanced_training,
+                  lambda: HeapSelector("Times Leveled"),
+                  heap=True, incremental=True))
+register(Strategy("easy", calculate_easy_training,
+                  lambda: HeapSelector("Final Level"),
+                  heap=True, incremental=True))
+register(Strategy("optimal", calculate_optimal_training))
+register(Strategy("cheap", calculate_cheap_training))
 
 
 if __name__ == "__main__":
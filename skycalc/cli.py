@@ -0,0 +1,253 @@
+"""Plan skill training for many characters without a display.
+
+Characters are read as JSON, either a single object or a list of objects:
+
+    {"race": "Nord", "template": "Criminal", "now": 1, "goal": 50}
+    {"skill_levels": {"Sneak": 40, "Archery": 35}, "now": 20, "goal": 40}
+    {"race": "Nord", "skills": ["Sneak"], "goal": 20, "legendary": []}
+
+See inputparser.RecordParser for all fields, "legendary" lists the skills
+that may be made legendary. Results are written as JSON (default) or as
+the text tables of the GUI export:
+
+    python cli.py characters.json --output plans.json
+    cat characters.json | python cli.py - --modes fast easy --format text
+
+With --lines the input is JSON Lines and every plan is written as its own
+line while the input is still read (see pipeline.py):
+
+    python cli.py characters.jsonl --lines --output plans.jsonl
+
+With --cache-file plans are kept in an SQLite file (see cache.py), later
+runs and the server can reuse them.
+"""
+
+import argparse
+import collections
+import json
+import sqlite3
+import sys
+
+import calculator as calc
+import effort
+import inputparser as parse
+import pipeline
+import trainers
+
+
+def load(source):
+    """Return a list of character records read from a JSON file object."""
+    records = json.load(source)
+    if isinstance(records, dict):
+        return [records]
+    return records
+
+
+def plan(record, modes, cache=None):
+    """Return an ordered dict mapping mode names to training data.
+
+    Plans are looked up in and added to the optional PlanCache. Raises
+    ValueError if the goal can not be reached with the legendary skills
+    of the record.
+    """
+    collector = parse.RecordParser.collect(record)
+    now, goal = collector.get_char_levels()
+    skill_levels = collector.get_skill_levels()
+    legendary = collector.get_legendary()
+    if cache is None:
+        return collections.OrderedDict(
+            (mode, calc.MODES[mode](skill_levels, now, goal, legendary))
+            for mode in modes)
+    return collections.OrderedDict(
+        (mode, cache.calculate(skill_levels, now, goal, mode, legendary))
+        for mode in modes)
+
+
+def plan_all(records, modes, workers=None, cache=None):
+    """Return one result dict per record.
+
+    Results contain either "plans" or "error" and "problems", a record
+    that can not be collected or planned never stops the others. With more
+    than one worker the plans are calculated in worker processes.
+    Attributes:
+        records: character records
+        modes: names of the training modes
+        workers (int): number of worker processes
+        cache: optional PlanCache
+    """
+    if workers is None or workers < 2:
+        return [_plan_or_error(record, modes, cache) for record in records]
+
+    from planner import Planner
+    results = []
+    with Planner(max_workers=workers, cache=cache) as planner:
+        pending = []
+        for record in records:
+            try:
+                collector = parse.RecordParser.collect(record)
+            except Exception as e:
+                pending.append((_error(e), None))
+                continue
+            now, goal = collector.get_char_levels()
+            pending.append((None, planner.submit_all(
+                collector.get_skill_levels(), now, goal, modes,
+                collector.get_legendary())))
+        for error, futures in pending:
+            if error is not None:
+                results.append(error)
+                continue
+            try:
+                results.append({"plans": collections.OrderedDict(
+                    (mode, future.result())
+                    for mode, future in futures.items())})
+            except Exception as e:
+                results.append(_error(e))
+    return results
+
+
+def report(results):
+    """Return the results as text tables."""
+    sections = []
+    for i, result in enumerate(results):
+        header = "Character {}".format(i + 1)
+        if "error" in result:
+            text = "{}: {}".format(header, result["error"])
+            if result["problems"]:
+                text += " ({})".format(", ".join(result["problems"]))
+            sections.append(text + "\n")
+        else:
+            sections.append("{}\n\n{}".format(
+                header, parse.OutputFormatter.report(result["plans"])))
+    return "\n\n\n".join(sections)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSON file with characters, - for "
+                                      "stdin")
+    parser.add_argument("--output", help="write results to this file "
+                                         "instead of stdout")
+    parser.add_argument("--modes", nargs="+", choices=list(calc.MODES),
+                        default=list(calc.MODES),
+                        help="training methods (default: all)")
+    parser.add_argument("--format", choices=("json", "text"), default="json")
+    parser.add_argument("--workers", type=int,
+                        help="calculate in this many worker processes")
+    parser.add_argument("--lines", action="store_true",
+                        help="stream JSON Lines input and output")
+    parser.add_argument("--gold", action="store_true",
+                        help="add the trainer price of every plan to the "
+                             "JSON output")
+    parser.add_argument("--effort", action="store_true",
+                        help="add skill-use xp and playing hours of every "
+                             "plan and rank the plans by hours")
+    parser.add_argument("--cache-file",
+                        help="keep plans in this SQLite file and reuse them")
+    args = parser.parse_args(arguments)
+
+    try:
+        cache = _open_cache(args.cache_file)
+    except (OSError, sqlite3.Error) as e:
+        sys.stderr.write("Could not open {}: {}\n".format(args.cache_file, e))
+        return 2
+
+    if args.lines:
+        if args.format != "json":
+            parser.error("--lines only supports JSON output")
+        return _stream(args, cache)
+
+    try:
+        if args.input == "-":
+            records = load(sys.stdin)
+        else:
+            with open(args.input) as source:
+                records = load(source)
+    except (OSError, ValueError) as e:
+        sys.stderr.write("Could not read {}: {}\n".format(args.input, e))
+        return 2
+    if not isinstance(records, list):
+        sys.stderr.write("Expected a JSON object or list of objects.\n")
+        return 2
+
+    results = [collections.OrderedDict(character=i) for i in
+               range(len(records))]
+    for result, planned in zip(results, plan_all(records, args.modes,
+                                                 args.workers, cache)):
+        result.update(sorted(planned.items()))
+        if args.gold and "plans" in result:
+            result["gold"] = trainers.price_plans(result["plans"])
+        if args.effort and "plans" in result:
+            result.update(_effort(result["plans"]))
+
+    if args.format == "text":
+        text = report(results)
+    else:
+        text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    return 1 if any("error" in result for result in results) else 0
+
+
+def _stream(args, cache=None):
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input)
+    except OSError as e:
+        sys.stderr.write("Could not read {}: {}\n".format(args.input, e))
+        return 2
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        if args.workers is None or args.workers < 2:
+            errors = pipeline.run(source, output, args.modes,
+                                  flush=output.isatty(), cache=cache)
+        else:
+            from planner import Planner
+            with Planner(max_workers=args.workers, cache=cache) as planner:
+                errors = pipeline.run(source, output, args.modes, planner,
+                                      flush=output.isatty())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    return 1 if errors else 0
+
+
+def _effort(plans):
+    model = effort.XpModel()
+    return collections.OrderedDict([
+        ("skill_xp", {mode: round(sum(model.plan_xp(plan).values()))
+                      for mode, plan in plans.items()}),
+        ("hours", {mode: round(model.plan_hours(plan), 1)
+                   for mode, plan in plans.items()}),
+        ("ranking", model.rank(plans))])
+
+
+def _open_cache(path):
+    """Return a PlanCache backed by an SQLite file, None without a path."""
+    if path is None:
+        return None
+    import cache as c
+    return c.PlanCache(backend=c.DiskPlanCache(path))
+
+
+def _error(exception):
+    if isinstance(exception, parse.ValidationException):
+        return {"error": str(exception),
+                "problems": list(exception.get_problems() or [])}
+    return {"error": "{}: {}".format(type(exception).__name__, exception),
+            "problems": []}
+
+
+def _plan_or_error(record, modes, cache=None):
+    try:
+        return {"plans": plan(record, modes, cache)}
+    except Exception as e:
+        return _error(e)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
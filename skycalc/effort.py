@@ -0,0 +1,90 @@
+"""Skill-use xp and playing time needed for training plans.
+
+Skills level up from use. Advancing from level to level + 1 needs
+improve_mult * (level - 1) ** 1.95 + improve_offset skill-use xp, with
+per-skill values from the game files (see SKILL_IMPROVEMENT). The total for
+a plan comes from cumulative tables (tables.StepTable), so evaluating a
+plan takes one lookup per skill:
+
+    model = XpModel(rates={"Smithing": 2000})
+    model.plan_hours(plan)
+    model.rank(plans)  # mode names, least effort first
+"""
+
+import collections
+
+from tables import StepTable
+
+# skill: (improve mult, improve offset) of the game's skill records, the
+# per-action skill use mults only scale the xp single actions give
+SKILL_IMPROVEMENT = {"Illusion": (2, 0),
+                     "Conjuration": (2, 0),
+                     "Destruction": (2, 0),
+                     "Restoration": (2, 0),
+                     "Alteration": (2, 0),
+                     "Enchanting": (1, 170),
+
+                     "Smithing": (0.25, 300),
+                     "Heavy Armor": (2, 0),
+                     "Block": (2, 0),
+                     "Two-handed": (2, 0),
+                     "One-handed": (2, 0),
+                     "Archery": (2, 0),
+
+                     "Light Armor": (2, 0),
+                     "Sneak": (0.5, 120),
+                     "Lockpicking": (0.25, 300),
+                     "Pickpocket": (0.25, 250),
+                     "Speech": (2, 0),
+                     "Alchemy": (1.6, 65)}
+
+# skill-use xp gained per hour of playing, if nothing else is known
+DEFAULT_RATE = 3600.0
+
+
+class XpModel:
+    """Skill-use xp tables of all skills.
+
+    Attributes:
+        rates: optional dict mapping skills to skill-use xp per hour,
+            DEFAULT_RATE for skills that are missing
+        improvement: dict mapping skills to (improve mult, improve offset)
+    """
+
+    def __init__(self, rates=None, improvement=SKILL_IMPROVEMENT):
+        self.__rates = dict(rates or {})
+        self.__tables = {}
+        for skill, (mult, offset) in improvement.items():
+            # making a skill legendary needs no xp
+            self.__tables[skill] = StepTable(
+                [mult * max(level - 1, 0) ** 1.95 + offset
+                 for level in range(100)] + [0])
+
+    def skill_xp(self, skill, level, times):
+        """Return skill-use xp for training a skill a number of times."""
+        return self.__tables[skill].total(level, times)
+
+    def plan_xp(self, plan):
+        """Return skill-use xp of every skill of a plan, in plan order."""
+        return collections.OrderedDict(
+            (skill, self.skill_xp(skill, data["Start Level"],
+                                  data["Times Leveled"]))
+            for skill, data in plan.items())
+
+    def plan_hours(self, plan):
+        """Return the hours of playing a plan needs."""
+        return sum(xp / self.__rates.get(skill, DEFAULT_RATE)
+                   for skill, xp in self.plan_xp(plan).items())
+
+    def rank(self, plans):
+        """Return plan names ordered by playing time, least effort first.
+
+        Attributes:
+            plans: dict mapping names, e.g. modes, to plans
+        """
+        hours = {name: self.plan_hours(plan) for name, plan in plans.items()}
+        return sorted(plans, key=lambda name: hours[name])
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
@@ -257,17 +257,22 @@ class InputValidator:
     def is_valid_char_level(level):
         try:
             level = int(level)
-        except ValueError:
+        except (OverflowError, TypeError, ValueError):
             return False
 
         return 0 < level < 300  # arbitrary cap, >= 252
 
+    @staticmethod
+    def is_valid_legendary(skills):
+        return (skills is None or isinstance(skills, list) and
+                InputValidator.are_valid_skills(skills))
+
     @staticmethod
     def is_valid_level_combination(now, goal):
         try:
             now = int(now)
             goal = int(goal)
-        except ValueError:
+        except (OverflowError, TypeError, ValueError):
             return False
 
         return now < goal
@@ -280,6 +285,13 @@ class InputValidator:
     def is_valid_selection(selection):
         return isinstance(selection, list) and len(selection) > 0
 
+    @staticmethod
+    def is_valid_template(template):
+        if not isinstance(template, str):
+            return False
+        return (template in GameData.PLAY_STYLES or
+                template in GameData.RACE_NAMES)
+
     @staticmethod
     def is_valid_skill_dictionary(dictionary):
         if not isinstance(dictionary, dict) or len(dictionary) == 0:
@@ -291,7 +303,7 @@ class InputValidator:
     def is_valid_skill_level(level):
         try:
             level = int(level)
-        except ValueError:
+        except (OverflowError, TypeError, ValueError):
             return False
 
         return 15 <= level <= 100
@@ -309,6 +321,7 @@ class InputCollector:
         self.__validator = validator
 
         self.__goal = None
+        self.__legendary = None
         self.__now = None
         self.__race = None
         self.__selected_skills = None
@@ -318,6 +331,10 @@ class InputCollector:
     def get_char_levels(self):
         return self.__now, self.__goal
 
+    def get_legendary(self):
+        """Return the skills that may be made legendary, None for all."""
+        return self.__legendary
+
     def get_race(self):
         return self.__race
 
@@ -365,6 +382,13 @@ class InputCollector:
             raise ValidationException("Please enter valid levels.",
                                       ["Goal", "Now"])
 
+    def set_legendary(self, skills):
+        if self.__validator.is_valid_legendary(skills):
+            self.__legendary = None if skills is None else list(skills)
+        else:
+            raise ValidationException("Those legendary skills are invalid.",
+                                      ["legendary"])
+
     def set_race(self, race):
         if self.__validator.is_valid_race(race):
             self.__race = race
@@ -404,9 +428,92 @@ class InputCollector:
                                self.__selected_skills}
 
 
+class RecordParser:
+    """Fill collectors from character records, e.g. parsed JSON objects.
+
+    A record contains "goal" and optionally "now" (default 1), plus either
+    "race" (new character) or "skill_levels" (dict, existing character).
+    Skills are taken from "skills", "template" or "skill_levels", in this
+    order. "legendary" optionally lists the skills that may be made
+    legendary, all skills may by default and [] forbids it:
+
+        {"skill_levels": {"Sneak": 90, "Archery": 35}, "goal": 60,
+         "legendary": ["Sneak"]}
+    """
+
+    @staticmethod
+    def collect(record, collector=None):
+        """Return a collector holding the validated record data."""
+        if collector is None:
+            collector = InputCollector()
+        if not isinstance(record, dict):
+            raise ValidationException("A character must be an object.")
+
+        if "template" in record:
+            if not InputValidator.is_valid_template(record["template"]):
+                raise ValidationException("Unknown template.", ["template"])
+            collector.set_template(record["template"])
+
+        skill_levels = record.get("skill_levels")
+        if skill_levels is None:
+            collector.set_race(record.get("race"))
+
+        skills = record.get("skills")
+        if skills is None and collector.has_template():
+            skills = collector.get_template()
+        if skills is None and isinstance(skill_levels, dict):
+            skills = skill_levels
+        collector.set_selected_skills(
+            list(skills) if isinstance(skills, (list, tuple, dict)) else None)
+
+        if skill_levels is not None:
+            if not isinstance(skill_levels, dict):
+                raise ValidationException("Skill levels must be an object.")
+            selected = collector.get_selected_skills()
+            missing = [skill for skill in selected
+                       if skill not in skill_levels]
+            if missing:
+                raise ValidationException("Some skill levels are missing.",
+                                          missing)
+            collector.set_skill_levels(
+                {skill: skill_levels[skill] for skill in selected})
+
+        collector.set_char_levels(goal=record.get("goal"),
+                                  now=record.get("now", 1))
+        collector.set_legendary(record.get("legendary"))
+        return collector
+
+
 class OutputFormatter:
     """Return formatted Strings that can be printed or written to a file"""
 
+    @staticmethod
+    def report(plans, failed=None):
+        """Return tables for several training methods.
+
+        Attributes:
+            plans: ordered dict mapping method names to result data
+            failed: optional dict mapping names of methods that could not
+                be calculated to error messages
+        """
+        sections = []
+        for name, data in plans.items():
+            text = OutputFormatter.__header(name)
+            text += OutputFormatter.reformat(data)
+            text += "{:-^53}\n".format("")
+            sections.append(text)
+        for name, error in (failed or {}).items():
+            text = OutputFormatter.__header(name)
+            text += "Could not be calculated: {}\n".format(error)
+            text += "{:-^53}\n".format("")
+            sections.append(text)
+        return "\n\n\n".join(sections)
+
+    @staticmethod
+    def __header(name):
+        return "{:=^53}\n{:=^53}\n{:=^53}\n".format(
+            "", " {} METHOD ".format(name.upper()), "")
+
     @staticmethod
     def reformat(data):
         text = "                |     Levels     |       |   times   \n"
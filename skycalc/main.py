@@ -1,6 +1,7 @@
 import tkinter as tk
 
 import views as v
+import widgets as w
 
 
 # TODO: make more reusable
@@ -18,6 +19,11 @@ class Navigator:
         self.__n = 0  # must be set by set_content
         self.__content = None  # must be set by set_content
 
+    def reset(self):
+        """Go back to the first view."""
+        self.__i = 0
+        self.__update_content()
+
     def set_content(self, content):
         self.__n = len(content)
         self.__content = content
@@ -52,6 +58,7 @@ class Navigator:
 class GuiController:
     """Configure the main window and swap its content.
 
+    Every view is built once, then hidden, reset and shown again.
     Attributes:
         root (Tk): main window
     """
@@ -59,23 +66,52 @@ class GuiController:
     def __init__(self, root):
         self.__root = root
         self.__collector = None
+        self.__planner = None
+
+        self.__current = None  # displayed view
+        self.__input_getters = {}  # id of recipe: InputGetter
+        self.__results = None
+        self.__start = None
 
-        self.show_start()
+        # show the empty window first, fill it once the event loop runs
         self.__configure_window()
+        w.ImageImporter.open_pack()  # before any view loads an image
+        self.__root.bind("<Destroy>", lambda event: self.__on_destroy(event))
+        self.__root.after_idle(self.__fill_window)
 
     def show_input_forms(self, recipe):
-        self.__destroy_all_elements()
         self.__reset_collector()
-        v.InputGetter(self.__root, recipe, Navigator(self), self.__collector)
+        getter = self.__input_getters.get(id(recipe))
+        if getter is None:
+            getter = v.InputGetter(self.__root, recipe, Navigator(self),
+                                   self.__collector)
+            self.__input_getters[id(recipe)] = getter
+        else:
+            getter.reset(self.__collector)
+        self.__show(getter)
 
     def show_results(self):
-        self.__destroy_all_elements()
-        v.Results(self.__root, self.__collector,
-                  lambda x=None: self.show_start())
+        if self.__results is None:
+            self.__results = v.Results(self.__root, self.__collector,
+                                       lambda x=None: self.show_start(),
+                                       self.__get_planner())
+        else:
+            self.__results.reset(self.__collector)
+        self.__show(self.__results)
 
     def show_start(self):
-        self.__destroy_all_elements()
-        v.Start(self.__root, self)
+        if self.__start is None:
+            self.__start = v.Start(self.__root, self)
+        self.__show(self.__start)
+
+    def shutdown(self):
+        if self.__planner is not None:
+            self.__planner.shutdown(wait=False)
+
+    def __fill_window(self):
+        # a view may have been shown before the event loop ran
+        if self.__current is None:
+            self.show_start()
 
     def __configure_window(self):
         self.__root.iconbitmap("res/arrow.ico")
@@ -90,9 +126,22 @@ class GuiController:
         y_pos = (self.__root.winfo_screenheight() - height) / 2
         self.__root.geometry("%dx%d+%d+%d" % (width, height, x_pos, y_pos))
 
-    def __destroy_all_elements(self):
-        for child in self.__root.winfo_children():
-            child.destroy()
+    def __show(self, view):
+        if self.__current is not None and self.__current is not view:
+            self.__current.hide()
+        view.show()
+        self.__current = view
+
+    def __on_destroy(self, event):
+        if event.widget is self.__root:
+            w.ImageImporter.clear()  # images die with their root
+
+    def __get_planner(self):
+        if self.__planner is None:
+            import cache as c
+            import planner as p
+            self.__planner = p.Planner(cache=c.PlanCache())
+        return self.__planner
 
     def __reset_collector(self):
         import inputparser as p
@@ -101,5 +150,6 @@ class GuiController:
 
 if __name__ == "__main__":
     __root = tk.Tk()
-    GuiController(__root)
+    __controller = GuiController(__root)
     __root.mainloop()
+    __controller.shutdown()
@@ -0,0 +1,166 @@
+"""Plan skill training for a stream of characters.
+
+Characters are read as JSON Lines, one record per line (see
+inputparser.RecordParser), and every plan is emitted as its own JSON line
+as soon as it is calculated:
+
+    {"line": 1, "mode": "fast", "plan": {...}}
+    {"line": 2, "error": "Please select a race.", "problems": []}
+    {"line": 3, "mode": "fast", "error": "...", "problems": []}
+
+A record that can not be collected or planned, e.g. because its goal can
+not be reached with the skills it allows to be made "legendary", only
+produces error lines, the stream goes on with the next record.
+
+All steps are generators, so memory use does not depend on the input size.
+"""
+
+import collections
+import json
+
+import calculator as calc
+import inputparser as parse
+
+
+def read_records(lines):
+    """Yield (line number, record) for all non-blank lines.
+
+    Lines that are no valid JSON yield a ValidationException instead of
+    a record.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, parse.ValidationException("Invalid JSON.")
+
+
+def collect_records(records):
+    """Yield (line number, collector or the exception collecting raised)."""
+    for number, record in records:
+        if isinstance(record, Exception):
+            yield number, record
+            continue
+        try:
+            collector = parse.RecordParser.collect(record)
+        except Exception as e:
+            collector = e
+        yield number, collector
+
+
+def plan_records(collected, modes=None, cache=None):
+    """Yield one output item per (line, mode) and one per invalid line.
+
+    Plans are looked up in and added to the optional PlanCache.
+    """
+    if modes is None:
+        modes = list(calc.MODES)
+    for number, collector in collected:
+        if isinstance(collector, Exception):
+            yield _error(number, collector)
+            continue
+        now, goal = collector.get_char_levels()
+        skill_levels = collector.get_skill_levels()
+        legendary = collector.get_legendary()
+        for mode in modes:
+            try:
+                if cache is None:
+                    plan = calc.MODES[mode](skill_levels, now, goal,
+                                            legendary)
+                else:
+                    plan = cache.calculate(skill_levels, now, goal, mode,
+                                           legendary)
+            except Exception as e:
+                yield _error(number, e, mode)
+            else:
+                yield _item(number, mode, plan)
+
+
+def plan_records_parallel(collected, planner, modes=None, window=64):
+    """Like plan_records, but calculate in a Planner's worker processes.
+
+    At most window characters are in flight, output keeps the input order.
+    """
+    if modes is None:
+        modes = list(calc.MODES)
+    pending = collections.deque()
+    for number, collector in collected:
+        if isinstance(collector, Exception):
+            pending.append((number, collector, None))
+        else:
+            now, goal = collector.get_char_levels()
+            pending.append((number, None, planner.submit_all(
+                collector.get_skill_levels(), now, goal, modes,
+                collector.get_legendary())))
+        if len(pending) >= window:
+            for item in _finish(*pending.popleft()):
+                yield item
+    while pending:
+        for item in _finish(*pending.popleft()):
+            yield item
+
+
+def dump(items, output, flush=False):
+    """Write items to a file object, one JSON line each.
+
+    Returns the number of error lines.
+    """
+    errors = 0
+    for item in items:
+        errors += "error" in item
+        output.write(json.dumps(item))
+        output.write("\n")
+        if flush:
+            output.flush()
+    return errors
+
+
+def run(lines, output, modes=None, planner=None, flush=False, cache=None):
+    """Plan all JSON Lines records and write the results.
+
+    The cache is only used without a planner, a Planner has its own.
+    Returns the number of invalid records.
+    """
+    collected = collect_records(read_records(lines))
+    if planner is None:
+        items = plan_records(collected, modes, cache)
+    else:
+        items = plan_records_parallel(collected, planner, modes)
+    return dump(items, output, flush)
+
+
+def _error(number, exception, mode=None):
+    item = collections.OrderedDict(line=number)
+    if mode is not None:
+        item["mode"] = mode
+    if isinstance(exception, parse.ValidationException):
+        item["error"] = str(exception)
+        item["problems"] = list(exception.get_problems() or [])
+    else:
+        item["error"] = "{}: {}".format(type(exception).__name__, exception)
+        item["problems"] = []
+    return item
+
+
+def _finish(number, exception, futures):
+    if exception is not None:
+        yield _error(number, exception)
+        return
+    for mode, future in futures.items():
+        try:
+            plan = future.result()
+        except Exception as e:
+            yield _error(number, e, mode)
+        else:
+            yield _item(number, mode, plan)
+
+
+def _item(number, mode, plan):
+    return collections.OrderedDict([("line", number), ("mode", mode),
+                                    ("plan", plan)])
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
@@ -0,0 +1,98 @@
+"""Run calculator functions in a pool of worker processes."""
+
+import collections
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import cache as c
+import calculator as calc
+
+
+class Planner:
+    """Calculate skill training data in worker processes.
+
+    The pool is started on first use. Every job returns a future, cached
+    plans are returned as futures that are already done. Jobs may be
+    submitted from several threads.
+    Attributes:
+        max_workers (int): number of processes, defaults to the cpu count
+        cache: optional PlanCache
+    """
+
+    def __init__(self, max_workers=None, cache=None):
+        self.__max_workers = max_workers
+        self.__cache = cache
+        self.__executor = None
+        self.__lock = threading.Lock()
+
+    def map(self, jobs):
+        """Return futures for (skill levels, current, goal, mode) jobs.
+
+        A job may hold the skills that may be made legendary as fifth item.
+        """
+        return [self.submit(*job) for job in jobs]
+
+    def shutdown(self, wait=True):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=wait)
+            self.__executor = None
+
+    def submit(self, skill_levels, current_level, goal_level, mode,
+               legendary=None):
+        """Return a future for the training data of a single mode.
+
+        legendary lists the skills that may be made legendary, None allows
+        all skills.
+        """
+        if legendary is not None:
+            legendary = list(legendary)
+        if self.__cache is None:
+            return self.__get_executor().submit(calc.MODES[mode],
+                                                dict(skill_levels),
+                                                current_level, goal_level,
+                                                legendary)
+
+        key = c.plan_key(skill_levels, current_level, goal_level, mode,
+                         legendary)
+        plan = self.__cache.get(key)
+        if plan is not None:
+            future = Future()
+            future.set_result(plan)
+            return future
+
+        future = self.__get_executor().submit(calc.MODES[mode],
+                                              dict(skill_levels),
+                                              current_level, goal_level,
+                                              legendary)
+        future.add_done_callback(lambda f: self.__remember(key, f))
+        return future
+
+    def submit_all(self, skill_levels, current_level, goal_level,
+                   modes=None, legendary=None):
+        """Return an ordered dict mapping mode names to futures."""
+        if modes is None:
+            modes = calc.MODES
+        return collections.OrderedDict(
+            (mode, self.submit(skill_levels, current_level, goal_level, mode,
+                               legendary))
+            for mode in modes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def __remember(self, key, future):
+        if not future.cancelled() and future.exception() is None:
+            self.__cache.put(key, future.result())
+
+    def __get_executor(self):
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor(self.__max_workers)
+            return self.__executor
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
@@ -0,0 +1,49 @@
+"""Pack all images from /res into a single archive file.
+
+Reading one file at startup is much faster than opening ~100 small ones,
+e.g. on network drives. Run this script again whenever /res changes:
+
+    python resources.py
+"""
+
+import io
+import os
+import zipfile
+
+PACK = "res.pack"
+RES = "res"
+
+
+def build(directory=RES, path=PACK):
+    """Write every .png-image below directory into an uncompressed archive.
+
+    Archive entries are named like ImageImporter resources, e.g. 'bread/NEW'.
+    Returns the number of packed images.
+    """
+    count = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        for folder, _, files in sorted(os.walk(directory)):
+            for file_name in sorted(files):
+                name, extension = os.path.splitext(file_name)
+                if extension != ".png":
+                    continue
+                full_path = os.path.join(folder, file_name)
+                entry = os.path.relpath(os.path.join(folder, name), directory)
+                archive.write(full_path, entry.replace(os.sep, "/"))
+                count += 1
+    return count
+
+
+def read(path=PACK):
+    """Return a dict mapping resource names to raw .png data.
+
+    The archive is read with a single sequential read.
+    """
+    with open(path, "rb") as pack:
+        data = io.BytesIO(pack.read())
+    with zipfile.ZipFile(data) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+if __name__ == "__main__":
+    print("Packed {} images into {}.".format(build(), PACK))
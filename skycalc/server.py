@@ -0,0 +1,212 @@
+"""Serve training plans over HTTP.
+
+POST a character record (see inputparser.RecordParser) or a list of
+records as JSON to /plan. A record may contain "modes", a list of
+training methods, all methods are planned by default. "legendary" limits
+the skills that may be made legendary:
+
+    python server.py --port 8642 --workers 4
+    curl -d '{"race": "Nord", "template": "Criminal", "goal": 30}' \\
+        localhost:8642/plan
+    curl -d '{"race": "Nord", "skills": ["Sneak"], "goal": 20,
+              "legendary": []}' localhost:8642/plan
+
+A single record is answered with an object, a list with a list of objects
+in the same order. Each object holds either "plans" or "error" and
+"problems", a plan that could not be calculated makes "problems" list its
+mode. Records that can not be read give such an error object as well.
+Requests with modes that are no list of strings get status 400, requests
+beyond the concurrency limit get status 503.
+"""
+
+import argparse
+import collections
+import json
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import cache as c
+import calculator as calc
+import inputparser as parse
+from planner import Planner
+
+MAX_BODY = 1 << 20
+
+
+class PlanServer(socketserver.ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server answering requests with a shared Planner.
+
+    Attributes:
+        address: (host, port)
+        planner: Planner used for all requests
+        concurrency (int): number of requests handled at the same time
+        quiet (bool): do not log requests
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, planner, concurrency=8, quiet=False):
+        HTTPServer.__init__(self, address, PlanHandler)
+        self.planner = planner
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.quiet = quiet
+
+    def plan(self, record):
+        """Return the response object for a single record.
+
+        Futures of the plans, or the error object if the record can not be
+        collected or submitted.
+        """
+        try:
+            collector = parse.RecordParser.collect(record)
+            modes = record.get("modes", list(calc.MODES))
+            if (not isinstance(modes, list) or not modes or
+                    any(mode not in calc.MODES for mode in modes)):
+                raise parse.ValidationException("Unknown training method.",
+                                                ["modes"])
+            now, goal = collector.get_char_levels()
+            return self.planner.submit_all(collector.get_skill_levels(), now,
+                                           goal, modes,
+                                           collector.get_legendary())
+        except parse.ValidationException as e:
+            return collections.OrderedDict([
+                ("error", str(e)),
+                ("problems", list(e.get_problems() or []))])
+        except Exception as e:
+            return collections.OrderedDict([
+                ("error", "{}: {}".format(type(e).__name__, e)),
+                ("problems", [])])
+
+    def plan_all(self, records):
+        """Return response objects for several records.
+
+        All records are submitted before waiting for the first result, so
+        a batch is calculated in parallel.
+        """
+        pending = [self.plan(record) for record in records]
+        return [_resolve(item) for item in pending]
+
+
+class PlanHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.__send(200, {"status": "ok"})
+        else:
+            self.__send(404, {"error": "Not found."})
+
+    def do_POST(self):
+        if self.path != "/plan":
+            self.__send(404, {"error": "Not found."})
+            return
+        if not self.server.slots.acquire(blocking=False):
+            self.__send(503, {"error": "Too many requests."})
+            return
+        try:
+            self.__plan()
+        except Exception as e:
+            # never leave a client without an answer
+            self.log_error("Planning failed: %r", e)
+            self.__send(500, {"error": "Internal error."})
+        finally:
+            self.server.slots.release()
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def __plan(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if not 0 < length <= MAX_BODY:
+            self.__send(400, {"error": "Invalid request size."})
+            return
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8"))
+        except ValueError:
+            self.__send(400, {"error": "Invalid JSON."})
+            return
+
+        records = body if isinstance(body, list) else [body]
+        if not all(_valid_modes(record) for record in records):
+            self.__send(400, {"error": "Modes must be a list of strings."})
+            return
+        if isinstance(body, list):
+            self.__send(200, self.server.plan_all(body))
+        else:
+            self.__send(200, _resolve(self.server.plan(body)))
+
+    def __send(self, status, data):
+        content = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def _resolve(item):
+    if "error" in item:
+        return item
+    plans, failed = collections.OrderedDict(), collections.OrderedDict()
+    for mode, future in item.items():
+        try:
+            plans[mode] = future.result()
+        except Exception as e:
+            failed[mode] = e
+    if failed:
+        return collections.OrderedDict([
+            ("error", "; ".join("{}: {}".format(mode, e)
+                                for mode, e in failed.items())),
+            ("problems", list(failed))])
+    return {"plans": plans}
+
+
+def _valid_modes(record):
+    if not isinstance(record, dict) or "modes" not in record:
+        return True
+    modes = record["modes"]
+    return (isinstance(modes, list) and
+            all(isinstance(mode, str) for mode in modes))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8642)
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: cpu count)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="requests handled at the same time "
+                             "(default: 8)")
+    parser.add_argument("--cache", type=int, default=1024,
+                        help="number of cached plans (default: 1024)")
+    parser.add_argument("--cache-file",
+                        help="also keep plans in this SQLite file, so they "
+                             "survive restarts")
+    parser.add_argument("--quiet", action="store_true",
+                        help="do not log requests")
+    args = parser.parse_args(arguments)
+
+    backend = None
+    if args.cache_file is not None:
+        backend = c.DiskPlanCache(args.cache_file)
+    with Planner(args.workers, c.PlanCache(args.cache, backend)) as planner:
+        server = PlanServer((args.host, args.port), planner,
+                            args.concurrency, args.quiet)
+        sys.stderr.write("Serving on {}:{}\n".format(*server.server_address))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Sums of per-training amounts, like gold or skill-use xp, by skill level."""
+
+
+class StepTable:
+    """Precomputed prefix sums of an amount paid for every training.
+
+    Sums over any number of trainings, legendary resets included, take a
+    constant number of lookups.
+    Attributes:
+        amounts: 101 amounts, amounts[level] for training at level (0-99),
+            amounts[100] for making a skill legendary (100 -> 16)
+    """
+
+    def __init__(self, amounts):
+        self.amounts = tuple(amounts)
+        # sums[level]: total for training from 0 up to level
+        sums = [0]
+        for amount in self.amounts[:100]:
+            sums.append(sums[-1] + amount)
+        self.sums = tuple(sums)
+        # one legendary cycle, 100 -> 16 -> ... -> 100
+        self.cycle = self.amounts[100] + self.sums[100] - self.sums[16]
+
+    def total(self, level, times):
+        """Return the total for training a skill a number of times.
+
+        Attributes:
+            level (int): current skill level
+            times (int): number of trainings
+        """
+        if level + times <= 100:
+            return self.sums[level + times] - self.sums[level]
+        cycles, rest = divmod(times - (100 - level), 85)
+        total = self.sums[100] - self.sums[level] + cycles * self.cycle
+        if rest:  # the first training of a cycle is the reset
+            total += self.amounts[100] + self.sums[15 + rest] - self.sums[16]
+        return total
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
@@ -0,0 +1,75 @@
+"""Gold prices of skill trainings bought from trainers.
+
+Training a skill from level to level + 1 costs about level ** 1.95 + 0.725
+gold, making it legendary (100 -> 16) is free. Trainers sell at most 5
+trainings per character level.
+Prices of whole plans come from prefix sums (tables.StepTable), so pricing
+a plan takes one lookup per skill.
+"""
+
+from tables import StepTable
+
+TRAININGS_PER_LEVEL = 5
+
+
+class PriceTable(StepTable):
+    """Precomputed trainer prices.
+
+    Attributes:
+        exponent (float): price growth with the skill level
+        offset (float): added to every price
+        factor (float): multiplies every price, e.g. for speech discounts
+    """
+
+    def __init__(self, exponent=1.95, offset=0.725, factor=1.0):
+        StepTable.__init__(self, [
+            int(round(factor * (level ** exponent + offset)))
+            for level in range(100)] + [0])
+        # prices[level]: gold for one training at level, 100 is legendary
+        self.prices = self.amounts
+
+    def price(self, level, times):
+        """Return gold for training a skill a number of times.
+
+        Attributes:
+            level (int): current skill level
+            times (int): number of trainings
+        """
+        return self.total(level, times)
+
+    def price_plan(self, plan):
+        """Return gold for buying every training of a plan."""
+        return sum(self.total(data["Start Level"], data["Times Leveled"])
+                   for data in plan.values())
+
+
+DEFAULT_PRICES = PriceTable()
+
+
+def price_plan(plan, prices=DEFAULT_PRICES):
+    """Return gold for buying every training of a plan.
+
+    Attributes:
+        plan: skill training data as returned by the calculator
+        prices: PriceTable
+    """
+    return prices.price_plan(plan)
+
+
+def price_plans(plans, prices=DEFAULT_PRICES):
+    """Return a dict mapping plan names to their gold price."""
+    return {name: prices.price_plan(plan) for name, plan in plans.items()}
+
+
+def training_cap(current_level, goal_level):
+    """Return how many trainings can be bought on the way to the goal."""
+    return TRAININGS_PER_LEVEL * max(goal_level - current_level, 0)
+
+
+def trainings(plan):
+    """Return the number of trainings of a plan."""
+    return sum(data["Times Leveled"] for data in plan.values())
+
+
+if __name__ == "__main__":
+    print(__doc__, "Not meant to be used as main.")
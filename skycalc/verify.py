@@ -0,0 +1,302 @@
+"""Check the calculator shortcuts against slow reference calculations.
+
+The calculate_* functions skip ahead instead of training one level at a
+time. On random input they are compared with
+- simulate_training, for every strategy with a selector,
+- the vectorized versions in batch.py,
+- an exhaustive search, for the fewest level-ups of optimal training
+  and the least gold of cheap training,
+- a new calculation, for plans updated by replan,
+- the same references with skills that may not be made legendary
+  (legendary), stepping modes skip those skills at 100.
+Runs without a display:
+
+    python verify.py --cases 500 --seed 1
+
+The exit code is 1 if any result differs.
+"""
+
+import argparse
+import itertools
+import random
+import sys
+
+import batch
+import calculator as calc
+import trainers
+from inputparser import GameData
+
+# skill levels random skills are drawn from, edge cases are likely
+LEVEL_POOLS = ((15, 16, 17), (15, 100), (90, 95, 99, 100),
+               tuple(range(15, 101)))
+
+
+def random_input(rng, max_skills=6, max_levels=300):
+    """Return random (skill levels, current level, goal level)."""
+    skills = rng.sample(GameData.SKILL_NAMES, rng.randint(1, max_skills))
+    pool = rng.choice(LEVEL_POOLS)
+    levels = {skill: rng.choice(pool) for skill in skills}
+    current = rng.randint(1, 60)
+    goal = min(current + rng.choice((0, 1, 5, 30, max_levels)), 299)
+    return levels, current, goal
+
+
+def check_engines(rng, cases):
+    """Return differences between calculate_* and simulate_training."""
+    failures = []
+    for _ in range(cases):
+        levels, current, goal = random_input(rng)
+        for name, strategy in calc.STRATEGIES.items():
+            if strategy.selector is None:
+                continue
+            expected = calc.simulate_training(levels, current, goal,
+                                              strategy.selector())
+            if strategy.plan(levels, current, goal) != expected:
+                failures.append("{} {}".format(name, (levels, current,
+                                                      goal)))
+    return failures
+
+
+def check_batch(rng, cases):
+    """Return differences between batch.py and the calculator."""
+    jobs = []
+    for _ in range(cases):
+        levels, current, goal = random_input(rng)
+        # ties are broken by column order in batch.py
+        jobs.append(({skill: levels[skill] for skill in GameData.SKILL_NAMES
+                      if skill in levels}, current, goal))
+    matrix = batch.skill_matrix([levels for levels, _, _ in jobs])
+    currents = [current for _, current, _ in jobs]
+    goals = [goal for _, _, goal in jobs]
+
+    failures = []
+    for name in batch.BATCH_FUNCTIONS:
+        result = batch.calculate_batch(name, matrix, currents, goals)
+        for row, (levels, current, goal) in enumerate(jobs):
+            plan = calc.MODES[name](levels, current, goal)
+            for skill, data in plan.items():
+                column = GameData.SKILL_NAMES.index(skill)
+                if any(result[key][row, column] != data[key]
+                       for key in result):
+                    failures.append("batch {} {}".format(
+                        name, (levels, current, goal)))
+                    break
+    return failures
+
+
+def check_optimal(rng, cases):
+    """Return inputs optimal training needs too many level-ups for."""
+    failures = []
+    for _ in range(cases):
+        levels, current, goal = random_input(rng, max_skills=3,
+                                             max_levels=12)
+        plan, minimum = calc.optimal_training(levels, current, goal)
+        needed = calc.character_xp(current, goal)
+        gained = sum(calc.skill_xp(data["Start Level"], data["Times Leveled"])
+                     for data in plan.values())
+        trainings = sum(data["Times Leveled"] for data in plan.values())
+        # no plan with one training less may reach the goal
+        best = most_xp(list(levels.values()), minimum)
+        fewer = best[minimum - 1] if minimum > 0 else -1
+        if (gained < needed or trainings != minimum or
+                best[minimum] < needed or fewer >= needed):
+            failures.append("optimal {}".format((levels, current, goal)))
+    return failures
+
+
+def check_cheap(rng, cases):
+    """Return inputs cheap training pays too much gold for."""
+    prices = trainers.DEFAULT_PRICES
+    failures = []
+    for _ in range(cases):
+        levels, current, _ = random_input(rng, max_skills=3)
+        goal = current + rng.randint(0, 3)
+        plan = calc.cheapest_training(levels, current, goal)
+        needed = calc.character_xp(current, goal)
+        cap = trainers.training_cap(current, goal)
+        found = (sum(prices.price(data["Start Level"], data["Times Leveled"])
+                     for data in plan.values()),
+                 sum(data["Times Leveled"] for data in plan.values()))
+        gained = sum(calc.skill_xp(data["Start Level"], data["Times Leveled"])
+                     for data in plan.values())
+        # plans over the cap are only made if no plan keeps it
+        best = least_gold(list(levels.values()), needed, cap)
+        if gained < needed or found != (best or found) or (
+                best is None and found[1] <= cap):
+            failures.append("cheap {}".format((levels, current, goal)))
+    return failures
+
+
+def check_legendary(rng, cases):
+    """Return plans with forbidden legendary skills that differ."""
+    failures = []
+    for _ in range(cases):
+        levels, current, goal = random_input(rng, max_skills=3,
+                                             max_levels=12)
+        legendary = [skill for skill in levels if rng.random() < 0.5]
+        start = list(levels.values())
+        # trainings of a skill that stops at 100
+        limits = [None if skill in legendary else 100 - levels[skill]
+                  for skill in levels]
+        needed = calc.character_xp(current, goal)
+        reachable = (None in limits or
+                     sum(calc.skill_xp(level, limit)
+                         for level, limit in zip(start, limits)) >= needed)
+        for name in calc.MODES:
+            try:
+                plan = calc.MODES[name](levels, current, goal, legendary)
+            except ValueError:
+                plan = None
+            if plan is None or not reachable:
+                same = plan is None and not reachable
+            elif name in STEPPING:
+                same = plan == step_training(levels, current, goal,
+                                             legendary, *STEPPING[name])
+            else:
+                same = restricted_plan_ok(name, plan, levels, current, goal,
+                                          legendary)
+            if not same:
+                failures.append("legendary {} {} {}".format(
+                    name, (levels, current, goal), legendary))
+    return failures
+
+
+def check_replan(rng, cases):
+    """Return differences between replan and a new calculation."""
+    failures = []
+    for _ in range(cases):
+        levels, current, goal = random_input(rng)
+        new_levels = dict(levels)
+        new_goal = goal
+        if rng.random() < 0.5:
+            new_goal = min(goal + rng.randint(0, 50), 299)
+        else:
+            new_levels[rng.choice(list(levels))] = rng.randint(15, 100)
+        for name, strategy in calc.STRATEGIES.items():
+            if not strategy.incremental:
+                continue
+            plan = calc.replan(strategy.plan(levels, current, goal), name,
+                               (levels, current, goal),
+                               (new_levels, current, new_goal))
+            if plan != strategy.plan(new_levels, current, new_goal):
+                failures.append("replan {} {} -> {}".format(
+                    name, (levels, current, goal),
+                    (new_levels, current, new_goal)))
+    return failures
+
+
+def most_xp(start, trainings, limits=None):
+    """Return the most xp for every number of trainings up to trainings.
+
+    Tries every way to share the trainings among the skills, optionally
+    with at most limits[i] trainings of skill i. -1 marks numbers of
+    trainings that can not be used.
+    """
+    if limits is None:
+        limits = [trainings] * len(start)
+    # best[count]: most xp of count trainings of the skills so far
+    best = [0] + [-1] * trainings
+    for level, limit in zip(start, limits):
+        best = [max([best[count - times] + calc.skill_xp(level, times)
+                     for times in range(min(count, limit) + 1)
+                     if best[count - times] >= 0] or [-1])
+                for count in range(trainings + 1)]
+    return best
+
+
+def least_gold(start, needed, cap, limits=None):
+    """Return (gold, trainings) of the cheapest plan of at most cap trainings.
+
+    Tries every number of trainings of every skill, optionally at most
+    limits[i] of skill i.
+    """
+    if limits is None:
+        limits = [cap] * len(start)
+    prices = trainers.DEFAULT_PRICES
+    best = None
+    for times in itertools.product(*(range(min(cap, limit) + 1)
+                                     for limit in limits)):
+        if (sum(times) > cap or sum(calc.skill_xp(level, count) for level, count
+                                    in zip(start, times)) < needed):
+            continue
+        found = (sum(prices.price(level, count)
+                     for level, count in zip(start, times)), sum(times))
+        if best is None or found < best:
+            best = found
+    return best
+
+
+# mode: (skill data entry, select the highest) of its stepping selector
+STEPPING = {"fast": ("Final Level", True),
+            "balanced": ("Times Leveled", False),
+            "easy": ("Final Level", False)}
+
+
+def step_training(levels, current, goal, legendary, key, highest):
+    """Return stepping training data that leaves other skills at 100."""
+    def select(states):
+        column = states.column(key)
+        usable = [i for i, skill in enumerate(states.names)
+                  if skill in legendary or states.final[i] < 100]
+        return (max if highest else min)(usable, key=lambda i: column[i])
+    return calc.train_skills(levels, current, goal, select).to_dict()
+
+
+def restricted_plan_ok(name, plan, levels, current, goal, legendary):
+    """Return whether an optimal or cheap plan is as good as possible."""
+    start = [levels[skill] for skill in plan]
+    times = [plan[skill]["Times Leveled"] for skill in plan]
+    limits = [100 - levels[skill] if skill not in legendary else sum(times)
+              for skill in plan]
+    needed = calc.character_xp(current, goal)
+    if (any(count > limit for count, limit in zip(times, limits)) or
+            sum(calc.skill_xp(level, count)
+                for level, count in zip(start, times)) < needed):
+        return False
+    if name == "optimal":
+        # no plan with fewer trainings may reach the goal
+        trainings = sum(times)
+        return trainings == 0 or max(most_xp(start, trainings - 1,
+                                             limits)) < needed
+    if name == "cheap" and goal - current <= 3:
+        cap = trainers.training_cap(current, goal)
+        best = least_gold(start, needed, cap, limits)
+        found = (sum(trainers.DEFAULT_PRICES.price(level, count)
+                     for level, count in zip(start, times)), sum(times))
+        return found == (best or found) and (best is not None or
+                                             found[1] > cap)
+    return True
+
+
+CHECKS = {"engines": check_engines,
+          "batch": check_batch,
+          "optimal": check_optimal,
+          "cheap": check_cheap,
+          "legendary": check_legendary,
+          "replan": check_replan}
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=200,
+                        help="random inputs per check (default: 200)")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--checks", nargs="+", choices=list(CHECKS),
+                        default=list(CHECKS), help="checks to run "
+                                                   "(default: all)")
+    args = parser.parse_args(arguments)
+
+    rng = random.Random(args.seed)
+    failed = 0
+    for name in args.checks:
+        failures = CHECKS[name](rng, args.cases)
+        print("{}: {} of {} cases differ".format(name, len(failures),
+                                                 args.cases))
+        for failure in failures[:10]:
+            sys.stderr.write("  {}\n".format(failure))
+        failed += len(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,12 +10,23 @@ import widgets as w
 class WindowContent(tk.Frame):
     """Standard view filling a window. Automatically packed!
 
+    Views are kept alive and reused: hide them instead of destroying them,
+    reset them with new data and show them again.
     Attributes:
         root (Tk): window that contains this element
     """
 
     def __init__(self, root):
         tk.Frame.__init__(self, root, bg=w.Colors.BG)
+        self.show()
+
+    def hide(self):
+        self.pack_forget()
+
+    def reset(self, collector):
+        pass  # expected method
+
+    def show(self):
         self.pack(fill="both", expand=True)
 
 
@@ -32,43 +43,58 @@ class InputGetter(WindowContent):
     def __init__(self, root, recipe, navigator, collector):
         WindowContent.__init__(self, root)
         self.__collector = collector
+        self.__navigator = navigator
 
         header = Header(self, [entry["Title"] for entry in recipe])
-        views = InputFormContainer(self,
-                                   [entry["View"] for entry in recipe],
-                                   self.__collector)
+        self.__views = InputFormContainer(self,
+                                          [entry["View"] for entry in recipe],
+                                          self.__collector)
         footer = Footer(self, [entry["Instruction"] for entry in recipe])
 
         navigator.set_content(
-            {"Header": header, "Views": views, "Footer": footer})
+            {"Header": header, "Views": self.__views, "Footer": footer})
 
     def get_collector(self):
         return self.__collector
 
+    def reset(self, collector):
+        """Clear all forms and start again with the first one."""
+        self.__collector = collector
+        self.__views.reset(collector)
+        self.__navigator.reset()
+
 
 class Results(WindowContent):
     """Display calculated results.
 
-    Three tabs + option to export.
+    One tab per training mode + option to export. Calculations run in the
+    background, each tab is filled as soon as its data is ready. If only
+    the goal was raised or a single skill level changed, the tabs of
+    incremental strategies are updated right away instead.
     Attributes:
         root (Tk): container window
         collector: data object
         return_command: allows to navigate back
+        planner: runs the calculations
+        modes: names of the displayed training modes, defaults to all
+            registered strategies (see calculator.register)
     """
 
-    def __init__(self, root, collector, return_command):
+    def __init__(self, root, collector, return_command, planner, modes=None):
         WindowContent.__init__(self, root)
         import calculator as calc
 
-        self.config(bg=w.Colors.SHADOW)
+        self.__planner = planner
+        self.__names = list(calc.STRATEGIES if modes is None else modes)
+        self.__futures = []
+        self.__data = []
+        self.__errors = []  # error messages of failed tabs, else None
+        self.__input = None  # (skill levels, now, goal) of self.__data
+        self.__legendary = None  # legendary skills of self.__data
+        self.__pending = []  # indices of tabs waiting for their data
+        self.__polling = None  # id of the scheduled poll
 
-        levels = collector.get_skill_levels()
-        now, goal = collector.get_char_levels()
-
-        self.__data = [calc.simulate_fast_training(levels, now, goal),
-                       calc.simulate_balanced_training(levels, now, goal),
-                       calc.simulate_easy_training(levels, now, goal)]
-        names = ["fast", "balanced", "easy"]
+        self.config(bg=w.Colors.SHADOW)
 
         top = tk.Frame(self, bg=w.Colors.BG)
         w.Image(top, "tab/results").pack(pady=20)
@@ -91,24 +117,124 @@ class Results(WindowContent):
                       return_command).pack(side="left", padx=10, pady=11)
         bottom.pack(fill="x", side="bottom")
 
-        tabs = self.__make_tabs(tab_container)
-        markers = self.__make_markers(marker_container, len(tabs))
-        buttons = self.__make_buttons(button_container, names, tabs, markers)
+        self.__tabs = self.__make_tabs(tab_container)
+        markers = self.__make_markers(marker_container, len(self.__tabs))
+        self.__buttons = self.__make_buttons(button_container, self.__names,
+                                             self.__tabs, markers)
+
+        self.reset(collector)
 
-        buttons[1].invoke()
+    def destroy(self):
+        self.__cancel()
+        WindowContent.destroy(self)
+
+    def hide(self):
+        self.__cancel()
+        WindowContent.hide(self)
+
+    def reset(self, collector):
+        """Start calculating results for new input."""
+        self.__cancel()
+
+        levels = collector.get_skill_levels()
+        now, goal = collector.get_char_levels()
+        legendary = collector.get_legendary()
+        new_input = (dict(levels), now, goal)
+        replanned = self.__replan(new_input, legendary)
+        self.__input = new_input
+        self.__legendary = legendary
+
+        # only the tabs that could not be updated are calculated again
+        self.__pending = [i for i in range(len(self.__names))
+                          if i not in replanned]
+        futures = self.__planner.submit_all(
+            levels, now, goal, [self.__names[i] for i in self.__pending],
+            legendary)
+        self.__futures = [None] * len(self.__names)
+        self.__data = [None] * len(self.__names)
+        self.__errors = [None] * len(self.__names)
+        for i, future in zip(self.__pending, futures.values()):
+            self.__futures[i] = future
+            self.__tabs[i].show_waiting()
+        for i, plan in replanned.items():
+            self.__data[i] = plan
+            self.__tabs[i].show_data(plan)
+
+        self.__show_default_tab()
+        if self.__pending:
+            self.__poll()
+
+    def __cancel(self):
+        """Stop waiting for results that are not needed anymore."""
+        if self.__polling is not None:
+            self.after_cancel(self.__polling)
+            self.__polling = None
+        for future in self.__futures:
+            if future is not None:
+                future.cancel()
+
+    def __show_default_tab(self):
+        """Show the balanced tab, or the first one if there is none."""
+        if "balanced" in self.__names:
+            self.__buttons[self.__names.index("balanced")].invoke()
+        else:
+            self.__buttons[0].invoke()
+
+    def __replan(self, new_input, legendary):
+        """Return {tab index: plan} of tabs updated for a small change.
+
+        Only finished tabs of incremental strategies can be updated, and
+        only if all skills may be made legendary.
+        """
+        import calculator as calc
+        if (self.__input is None or legendary is not None or
+                self.__legendary is not None):
+            return {}
+        replanned = {}
+        for i, name in enumerate(self.__names):
+            if self.__data[i] is None or not calc.STRATEGIES[name].incremental:
+                continue
+            plan = calc.replan(self.__data[i], name, self.__input, new_input)
+            if plan is not None:
+                replanned[i] = plan
+        return replanned
+
+    def __fill_tab(self, i):
+        future = self.__futures[i]
+        error = future.exception()
+        if error is not None:
+            self.__errors[i] = str(error) or type(error).__name__
+            self.__tabs[i].show_error(
+                "Something went wrong: {}".format(self.__errors[i]))
+            return
+        self.__data[i] = future.result()
+        self.__tabs[i].show_data(self.__data[i])
+
+    def __is_complete(self):
+        """Return whether every tab holds its data or an error."""
+        return all(data is not None or error is not None
+                   for data, error in zip(self.__data, self.__errors))
+
+    def __poll(self):
+        """Fill all tabs whose calculation is done, check again later."""
+        self.__polling = None
+        for i in list(self.__pending):
+            if self.__futures[i].done():
+                self.__pending.remove(i)
+                self.__fill_tab(i)
+        if self.__pending:
+            self.__polling = self.after(50, self.__poll)
 
     def __export(self):
+        import collections
         import inputparser as parse
-        text = "{:=^53}\n{:=^53}\n{:=^53}\n".format("", " FAST METHOD ", "")
-        text += parse.OutputFormatter.reformat(self.__data[0])
-        text += "{:-^53}\n\n\n\n".format("")
-        text += "{:=^53}\n{:=^53}\n{:=^53}\n".format("", " BALANCED METHOD ",
-                                                     "")
-        text += parse.OutputFormatter.reformat(self.__data[1])
-        text += "{:-^53}\n\n\n\n".format("")
-        text += "{:=^53}\n{:=^53}\n{:=^53}\n".format("", " EASY METHOD ", "")
-        text += parse.OutputFormatter.reformat(self.__data[2])
-        text += "{:-^53}\n".format("")
+        plans = collections.OrderedDict(
+            (name, data) for name, data in zip(self.__names, self.__data)
+            if data is not None)
+        failed = collections.OrderedDict(
+            (name, error) for name, error in zip(self.__names, self.__errors)
+            if error is not None)
+        text = parse.OutputFormatter.report(plans, failed)
         output = open('YOUR_RESULTS.txt', 'w')
         output.write(text)
         output.close()
@@ -120,6 +246,15 @@ class Results(WindowContent):
         text.config(wraplength=180)
         text.place(anchor="n", relx=0.5, y=15)
 
+        if not self.__is_complete():
+            text.show_normal("Your results are still being calculated.")
+            w.ImageButton(frame, "CLOSE",
+                          lambda x=None: frame.destroy()).place(anchor="s",
+                                                                relx=0.5,
+                                                                rely=1, y=-10)
+            frame.place(anchor="center", relx=0.5, rely=0.45)
+            return
+
         yes = w.ImageButton(frame, "YES", lambda x=None: __finish())
         yes.place(anchor="se", relx=1, rely=1, x=-10, y=-10)
         no = w.ImageButton(frame, "CANCEL", lambda x=None: frame.destroy())
@@ -160,9 +295,8 @@ class Results(WindowContent):
 
     def __make_tabs(self, parent):
         tabs = []
-        for data_set in self.__data:
-            tab = tk.Frame(parent, bg=parent.cget("bg"))
-            w.ResultTable(tab, data_set).pack()
+        for _ in self.__names:
+            tab = ResultTab(parent)
             tab.grid(row=0, column=0, sticky="nsew")
             tabs.append(tab)
         return tabs
@@ -337,6 +471,10 @@ class InputFormContainer(ViewElement):
         view = self.__views[i]
         view.collect_input()
 
+    def reset(self, collector):
+        for view in self.__views:
+            view.reset(collector)
+
 
 # Input Views
 
@@ -356,6 +494,9 @@ class InputForm(tk.Frame):
     def collect_input(self):
         pass  # expected method
 
+    def reset(self, collector):
+        pass  # expected method
+
     def set_focus(self):
         self.focus_set()
 
@@ -398,6 +539,12 @@ class CharLevels(InputForm):
             self.__show_problems(e.get_problems())
             raise e
 
+    def reset(self, collector):
+        self.__collector = collector
+        self.__current_level.clear()
+        self.__goal_level.clear()
+        self.update()
+
     def set_focus(self):
         self.__current_level.set_focus()
 
@@ -441,6 +588,11 @@ class GoalLevel(InputForm):
             self.__show_problems(e.get_problems())
             raise e
 
+    def reset(self, collector):
+        self.__collector = collector
+        self.__goal_level.clear()
+        self.update()
+
     def set_focus(self):
         self.__goal_level.set_focus()
 
@@ -487,6 +639,10 @@ class Races(InputForm):
         self.__collector.set_race(self.__selected)  # no try block necessary
         self.__collector.set_template(self.__selected)
 
+    def reset(self, collector):
+        self.__collector = collector
+        self.select("")
+
     def select(self, selection):
         self.__selected = selection
         for race in self.__races:
@@ -558,6 +714,9 @@ class SkillLevels(InputForm):
             self.__show_problems(e.get_problems())
             raise e
 
+    def reset(self, collector):
+        self.__collector = collector  # fields are rebuilt by update
+
     def set_focus(self):
         self.__skills[0].set_focus()
 
@@ -615,7 +774,8 @@ class SkillLevels(InputForm):
 class Skills(InputForm):
     """Let player select some skills.
 
-    Can be sorted by category or alphabetically.
+    Can be sorted by category or alphabetically. Legendary resets can be
+    forbidden for all skills.
     Attributes:
         parent (Frame): container frame
         collector: collects input data
@@ -625,10 +785,17 @@ class Skills(InputForm):
         InputForm.__init__(self, parent)
         self.__collector = collector
 
-        self.__sort_button = w.ToggleButton(self,
+        options = tk.Frame(self, bg=self.cget("bg"))
+        options.pack(anchor="ne", pady=10)
+        self.__legendary_allowed = True
+        self.__legendary_button = w.ToggleButton(
+            options, "Forbid legendary skills",
+            lambda x=None: self.__toggle_legendary())
+        self.__legendary_button.pack(side="left")
+        self.__sort_button = w.ToggleButton(options,
                                             "Sort alphabetically",
                                             lambda x=None: self.__sort())
-        self.__sort_button.pack(anchor="ne", pady=10)
+        self.__sort_button.pack(side="left")
 
         self.__template_column = tk.Frame(self, bg=self.cget("bg"),
                                           width=0, height=400)
@@ -679,6 +846,16 @@ class Skills(InputForm):
             selected = sorted(selected)
         self.__collector.set_template(None)
         self.__collector.set_selected_skills(selected)
+        self.__collector.set_legendary(None if self.__legendary_allowed
+                                       else [])
+
+    def reset(self, collector):
+        self.__collector = collector
+        self.__deselect_all()
+        if not self.__legendary_allowed:
+            self.__toggle_legendary()
+        if not self.__templates_hidden:
+            self.__toggle_template_menu()
 
     def update(self):
         if self.__collector.has_template():
@@ -732,6 +909,12 @@ class Skills(InputForm):
     def __sort(self):
         self.__sorter.sort()
 
+    def __toggle_legendary(self):
+        self.__legendary_allowed = not self.__legendary_allowed
+        self.__legendary_button.change_text(
+            "Forbid legendary skills" if self.__legendary_allowed
+            else "Allow legendary skills")
+
     def __toggle_template_menu(self):
         if self.__templates_hidden:
             self.__template_column.config(width=150)
@@ -744,6 +927,60 @@ class Skills(InputForm):
 
 # other
 
+class ResultTab(tk.Frame):
+    """Tab of the results view. Its table is built when it is first shown.
+
+    Attributes:
+        parent (Frame): container frame
+    """
+
+    def __init__(self, parent):
+        tk.Frame.__init__(self, parent, bg=parent.cget("bg"))
+
+        self.__data = None
+        self.__new_data = False  # table does not show the data yet
+        self.__shown = False  # raised at least once
+        self.__table = None
+
+        self.__message = w.Message(self, "")
+        self.show_waiting()
+
+    def show_data(self, data):
+        self.__data = data
+        self.__new_data = True
+        self.__message.pack_forget()
+        self.__render()
+
+    def show_error(self, message):
+        self.__data = None
+        if self.__table is not None:
+            self.__table.pack_forget()
+        self.__message.show_error(message)
+        self.__message.pack(pady=30)
+
+    def show_waiting(self):
+        self.__data = None
+        if self.__table is not None:
+            self.__table.pack_forget()
+        self.__message.show_normal("Calculating...")
+        self.__message.pack(pady=30)
+
+    def tkraise(self, above_this=None):
+        tk.Frame.tkraise(self, above_this)
+        self.__shown = True
+        self.__render()
+
+    def __render(self):
+        if not self.__shown or self.__data is None:
+            return
+        if self.__table is None:
+            self.__table = w.ResultTable(self, self.__data)
+        elif self.__new_data:
+            self.__table.set_data(self.__data)
+        self.__new_data = False
+        self.__table.pack()
+
+
 class Sorter:
     """Sorts displayed Selectables by type or name
 
@@ -132,7 +132,8 @@ class NavButton(tk.Button):
 class TabButton(tk.Button):
     """Tab index button.
 
-    For results view
+    For results view. Shows the images tab/names/<text_>(_SELECTED), or the
+    text itself if there are none.
     Attributes:
         parent (Frame): container frame
         text_ (str): displayed text
@@ -152,21 +153,26 @@ class TabButton(tk.Button):
         self.__buttons = buttons
         self.__marker = marker
 
-        self.__deselected = ImageImporter.load("tab/names/" + text_)
-        self.__selected = ImageImporter.load(
-            "tab/names/" + text_ + "_SELECTED")
+        try:
+            self.__deselected = ImageImporter.load("tab/names/" + text_)
+            self.__selected = ImageImporter.load(
+                "tab/names/" + text_ + "_SELECTED")
+        except OSError:  # e.g. a strategy added later
+            self.__deselected = self.__selected = ""
+            self.config(text=text_.upper(), font="-size 11", padx=14,
+                        activeforeground=Colors.LIGHT)
 
         self.config(command=lambda: self.__on_call())
 
         self.deselect()
 
     def deselect(self):
-        self.config(image=self.__deselected)
+        self.config(image=self.__deselected, fg=Colors.WHITE)
 
     def select(self):
         for button in self.__buttons:
             button.deselect()
-        self.config(image=self.__selected)
+        self.config(image=self.__selected, fg=Colors.LIGHT)
         if self.__marker is not None:
             self.__marker.select()
 
@@ -316,6 +322,9 @@ class BigField(tk.Frame):
 
         self.mark_valid()
 
+    def clear(self):
+        self.__entry.delete(0, "end")
+
     def get_input(self):
         return self.__entry.get()
 
@@ -419,32 +428,92 @@ class BreadcrumbMarker(tk.Label):
 class ResultTable(tk.Frame):
     """Displays result data (returned by calculator-functions) in a table.
 
+    Only visible_rows rows are built. Scrolling with the mouse wheel shows
+    other skills in the same widgets, set_data reuses them for new data.
     Attributes:
         parent (tk.Frame): container
         data (dict): displayed result data
+        visible_rows (int): maximum number of rows on screen
     """
 
-    def __init__(self, parent, data):
+    def __init__(self, parent, data, visible_rows=10):
         tk.Frame.__init__(self, parent, bg=parent.cget("bg"))
+        self.__visible_rows = visible_rows
+
+        self.__rows = []  # lists of TableEntries, recycled while scrolling
+        self.__skills = []  # skills shown in the table, sorted
+        self.__data = {}
+        self.__offset = 0  # index of the first visible skill
 
         headlines = ["SKILL", "CURRENT", "GOAL", "TRAIN", "LEGENDARY"]
         for i in range(len(headlines)):
             Image(self, "headlines/" + headlines[i]).grid(row=0, column=i,
                                                           pady=15)
 
-        sorted_relevant_skills = sorted(skill for skill in data.keys() if
-                                        data[skill]["Times Leveled"] != 0)
-
-        for i in range(len(sorted_relevant_skills)):
-            skill = sorted_relevant_skills[i]
-            entry = data[skill]
-            TableEntry(self, skill, True).grid(row=i + 1, column=0, pady=7)
-            TableEntry(self, entry["Start Level"]).grid(row=i + 1, column=1)
-            TableEntry(self, entry["Final Level"]).grid(row=i + 1, column=2)
-            TableEntry(self, str(entry["Times Leveled"]) + "x", True).grid(
-                row=i + 1, column=3)
-            TableEntry(self, str(entry["Times Legendary"]) + "x").grid(
-                row=i + 1, column=4)
+        self.__more = Message(self, "Scroll to see more skills.")
+        self.__bind_scrolling(self)
+
+        self.set_data(data)
+
+    def scroll(self, rows):
+        """Move the visible part of the table by some rows."""
+        last_offset = max(len(self.__skills) - self.__visible_rows, 0)
+        offset = min(max(self.__offset + rows, 0), last_offset)
+        if offset != self.__offset:
+            self.__offset = offset
+            self.__render()
+
+    def set_data(self, data):
+        self.__data = data
+        self.__skills = sorted(skill for skill in data.keys() if
+                               data[skill]["Times Leveled"] != 0)
+        self.__offset = 0
+
+        while len(self.__rows) < min(len(self.__skills),
+                                     self.__visible_rows):
+            self.__rows.append(self.__make_row(len(self.__rows) + 1))
+        self.__render()
+
+    def __bind_scrolling(self, widget):
+        widget.bind("<MouseWheel>",
+                    lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda event: self.scroll(-1))
+        widget.bind("<Button-5>", lambda event: self.scroll(1))
+
+    def __make_row(self, row):
+        entries = [TableEntry(self, "", True), TableEntry(self, ""),
+                   TableEntry(self, ""), TableEntry(self, "", True),
+                   TableEntry(self, "")]
+        entries[0].grid(row=row, column=0, pady=7)
+        for column in range(1, len(entries)):
+            entries[column].grid(row=row, column=column)
+        for entry in entries:
+            self.__bind_scrolling(entry)
+        return entries
+
+    def __render(self):
+        for i in range(len(self.__rows)):
+            index = self.__offset + i
+            if index >= len(self.__skills):
+                for entry in self.__rows[i]:
+                    entry.grid_remove()
+                continue
+
+            skill = self.__skills[index]
+            data = self.__data[skill]
+            texts = [skill, data["Start Level"], data["Final Level"],
+                     str(data["Times Leveled"]) + "x",
+                     str(data["Times Legendary"]) + "x"]
+            for entry, text_ in zip(self.__rows[i], texts):
+                entry.config(text=text_)
+                entry.grid()
+
+        if len(self.__skills) > self.__visible_rows:
+            self.__more.show_normal("Scroll to see more skills.")
+            self.__more.grid(row=self.__visible_rows + 1, column=0,
+                             columnspan=5, pady=7)
+        else:
+            self.__more.grid_remove()
 
 
 class TabMarker(tk.Label):
@@ -507,12 +576,50 @@ class Image(tk.Label):
 
 
 class ImageImporter:
-    """Import a .png-image from /res."""
+    """Import a .png-image from /res.
+
+    Every image is decoded once, when it is first loaded, and shared by all
+    widgets showing it. The images belong to the Tk root, call clear when
+    it is destroyed. After open_pack the images are decoded from the
+    resource pack in memory instead of their files (see resources.py).
+    """
 
-    @staticmethod
-    def load(image):
-        from PIL import Image, ImageTk
-        return ImageTk.PhotoImage(Image.open("res/" + image + ".png"))
+    __cache = {}  # image name: PhotoImage
+    __decoded = {}  # image name: decoded PIL image
+    __packed = {}  # image name: .png data read from the resource pack
+
+    @classmethod
+    def clear(cls):
+        cls.__cache.clear()
+
+    @classmethod
+    def load(cls, image):
+        if image not in cls.__cache:
+            from PIL import ImageTk
+            cls.__cache[image] = ImageTk.PhotoImage(cls.__decode(image))
+        return cls.__cache[image]
+
+    @classmethod
+    def open_pack(cls):
+        """Read the resource pack, if there is one, return its image count."""
+        import os
+        import resources
+
+        if not cls.__packed and os.path.exists(resources.PACK):
+            cls.__packed = resources.read()
+        return len(cls.__packed)
+
+    @classmethod
+    def __decode(cls, image):
+        if image not in cls.__decoded:
+            import io
+            from PIL import Image
+            data = cls.__packed.get(image)
+            source = ("res/" + image + ".png" if data is None
+                      else io.BytesIO(data))
+            cls.__decoded[image] = Image.open(source)
+            cls.__decoded[image].load()
+        return cls.__decoded[image]
 
 
 if __name__ == "__main__":